@@ -0,0 +1,155 @@
+import streamlit as st
+import pandas as pd
+import plotly.graph_objects as go
+
+from utils.analytics import cohort_stats
+
+# =========================
+# CONFIG
+# =========================
+st.set_page_config(page_title="Analitik Kohort", page_icon="📊", layout="wide")
+st.title("📊 Analitik Kohort Prediksi")
+st.markdown("Ringkasan seluruh prediksi yang sudah dibuat di halaman **Penyakit Jantung** dan **Gangguan Tidur**.")
+st.caption(
+    "Termasuk prediksi bulk (upload file) dan job latar belakang. Faktor risiko hanya dihitung "
+    "untuk prediksi dari form. Data baru tersimpan ke disk dalam beberapa detik."
+)
+st.markdown("---")
+
+# =========================
+# KONSTANTA
+# =========================
+MODELS = {
+    "❤️ Penyakit Jantung": "heart",
+    "😴 Gangguan Tidur":   "sleep",
+}
+
+CLASS_COLORS = {
+    "Tidak Ada Penyakit Jantung":  "#27ae60",
+    "Ada Penyakit Jantung":        "#e74c3c",
+    "Sehat":                       "#27ae60",
+    "Insomnia":                    "#e67e22",
+    "Sleep Apnea":                 "#e74c3c",
+}
+
+SEVERITY_ORDER = ["✅ Sehat", "🟡 Ringan", "🟠 Sedang", "🔴 Berat"]
+
+# =========================
+# PILIH MODEL
+# =========================
+model_display = st.radio("Model", list(MODELS.keys()), horizontal=True)
+stats = cohort_stats(MODELS[model_display])
+totals = stats.totals()
+labels = stats.class_labels
+
+if totals["n"] == 0:
+    st.info("Belum ada prediksi yang tercatat untuk model ini.")
+    st.stop()
+
+# ================================================================
+# RINGKASAN UTAMA
+# ================================================================
+st.subheader("📌 Ringkasan")
+cols = st.columns(len(labels) + 1)
+with cols[0]:
+    st.metric(label="Total Prediksi", value=f"{totals['n']:,}")
+for col, label, count, prob in zip(cols[1:], labels, totals["classes"], totals["prob_mean"]):
+    with col:
+        st.metric(
+            label=label,
+            value=f"{count / totals['n'] * 100:.1f}%",
+            delta=f"rata-rata prob. {prob * 100:.1f}%",
+            delta_color="off",
+        )
+
+# ================================================================
+# KOMPOSISI KELAS & PROBABILITAS RATA-RATA
+# ================================================================
+col_mix, col_prob = st.columns(2)
+colors = [CLASS_COLORS.get(label, "#7f8c8d") for label in labels]
+
+with col_mix:
+    fig = go.Figure(data=[go.Pie(labels=labels, values=totals["classes"], marker_colors=colors, hole=0.45)])
+    fig.update_layout(title="Komposisi Hasil Prediksi", height=350, template="plotly_white",
+                      margin=dict(l=20, r=20, t=60, b=20))
+    st.plotly_chart(fig, use_container_width=True)
+
+with col_prob:
+    prob_pct = [p * 100 for p in totals["prob_mean"]]
+    fig = go.Figure(data=[go.Bar(x=labels, y=prob_pct, marker_color=colors,
+                                 text=[f"{v:.1f}%" for v in prob_pct], textposition="outside", width=0.45)])
+    fig.update_layout(title="Rata-rata Probabilitas per Kelas", yaxis_title="Probabilitas (%)",
+                      yaxis=dict(range=[0, 110]), height=350, template="plotly_white",
+                      margin=dict(l=40, r=20, t=60, b=40))
+    st.plotly_chart(fig, use_container_width=True)
+
+# ================================================================
+# TREN HARIAN
+# ================================================================
+st.markdown("---")
+st.subheader("📈 Tren Harian")
+daily = stats.daily()
+
+fig = go.Figure()
+for label, color in zip(labels, colors):
+    fig.add_trace(go.Bar(x=daily["Tanggal"], y=daily[label], name=label, marker_color=color))
+fig.update_layout(barmode="stack", title="Jumlah Prediksi per Hari", yaxis_title="Jumlah",
+                  height=380, template="plotly_white", margin=dict(l=40, r=20, t=60, b=40))
+st.plotly_chart(fig, use_container_width=True)
+
+fig = go.Figure()
+for label, color in zip(labels, colors):
+    fig.add_trace(go.Scatter(x=daily["Tanggal"], y=daily[f"Prob. {label}"] * 100, name=label,
+                             mode="lines+markers", line_color=color))
+fig.update_layout(title="Rata-rata Probabilitas per Hari", yaxis_title="Probabilitas (%)",
+                  height=380, template="plotly_white", margin=dict(l=40, r=20, t=60, b=40))
+st.plotly_chart(fig, use_container_width=True)
+
+# ================================================================
+# FREKUENSI FAKTOR RISIKO
+# ================================================================
+st.markdown("---")
+st.subheader("⚠️ Frekuensi Faktor Risiko")
+if not totals["flags"]:
+    st.success("✅ Belum ada faktor risiko yang terdeteksi.")
+else:
+    flags = pd.Series(totals["flags"]).sort_values()
+    flag_pct = flags / totals["n_form"] * 100
+    fig = go.Figure(data=[go.Bar(x=flag_pct.values, y=flag_pct.index, orientation="h", marker_color="#e67e22",
+                                 text=[f"{v:.1f}%" for v in flag_pct.values], textposition="outside")])
+    fig.update_layout(title="Persentase Prediksi dengan Faktor Risiko", xaxis_title="% dari prediksi form",
+                      height=max(300, 40 * len(flags) + 100), template="plotly_white",
+                      margin=dict(l=180, r=60, t=60, b=40))
+    st.plotly_chart(fig, use_container_width=True)
+
+    daily_flags = stats.daily_counts("flags")
+    fig = go.Figure()
+    for name in flags.index[::-1]:
+        fig.add_trace(go.Scatter(x=daily_flags["Tanggal"], y=daily_flags[name] / daily_flags["Jumlah Form"] * 100,
+                                 name=name, mode="lines+markers"))
+    fig.update_layout(title="Persentase Faktor Risiko per Hari", yaxis_title="% dari prediksi form hari itu",
+                      height=380, template="plotly_white", margin=dict(l=40, r=20, t=60, b=40))
+    st.plotly_chart(fig, use_container_width=True)
+
+# ================================================================
+# DISTRIBUSI KEPARAHAN (model tidur)
+# ================================================================
+if totals["severity"]:
+    st.markdown("---")
+    st.subheader("🩺 Distribusi Tingkat Keparahan")
+    order = [s for s in SEVERITY_ORDER if s in totals["severity"]]
+    order += [s for s in totals["severity"] if s not in order]
+    values = [totals["severity"][s] for s in order]
+    fig = go.Figure(data=[go.Bar(x=order, y=values, marker_color="#8e44ad",
+                                 text=values, textposition="outside", width=0.45)])
+    fig.update_layout(title="Jumlah Prediksi per Tingkat Keparahan", yaxis_title="Jumlah",
+                      height=350, template="plotly_white", margin=dict(l=40, r=20, t=60, b=40))
+    st.plotly_chart(fig, use_container_width=True)
+
+    daily_severity = stats.daily_counts("severity")
+    fig = go.Figure()
+    for name in order:
+        fig.add_trace(go.Bar(x=daily_severity["Tanggal"], y=daily_severity[name], name=name))
+    fig.update_layout(barmode="stack", title="Tingkat Keparahan per Hari", yaxis_title="Jumlah",
+                      height=380, template="plotly_white", margin=dict(l=40, r=20, t=60, b=40))
+    st.plotly_chart(fig, use_container_width=True)
@@ -1,8 +1,22 @@
 import streamlit as st
 import pandas as pd
-import numpy as np
+import os
+import pathlib
+import tempfile
 import joblib
-import plotly.graph_objects as go
+
+from utils.analytics import cohort_stats
+from utils.charts import contribution_bar
+from utils.encoders import HEART_LABEL_MAPS
+from utils.explain import HeartLinearExplainer, load_heart_reference
+from utils.ingest import ResultSink, score_file
+from utils.jobs import (
+    FINAL_STATUSES, STATUS_DONE, cancel_job, delete_job, job_runner, list_jobs, result_path, submit_job,
+)
+from utils.models import HEART_FEATURES
+from utils.neighbors import NEIGHBORS_DIR, NeighborIndex
+from utils.results import HeartResult, flags_to_mask, mask_to_flags
+from utils.scoring import cohort_summary
 
 # =========================
 # CONFIG
@@ -24,51 +38,43 @@ st.markdown("---")
 def load_model():
     return joblib.load("models/logistic_regression_model.pkl")
 
+# Suku referensi per fitur dihitung sekali per proses
+@st.cache_resource
+def load_explainer(_model):
+    return HeartLinearExplainer(_model, load_heart_reference())
+
+# Index pasien serupa dibagi antar sesi (satu KD-tree per proses)
+@st.cache_resource
+def load_neighbor_index():
+    return NeighborIndex(os.path.join(NEIGHBORS_DIR, "heart"), n_features=13)
+
 model = load_model()
+explainer = load_explainer(model)
+neighbor_index = load_neighbor_index()
 
 # =========================
 # MAPPING
 # =========================
-sex_map = {
-    "Perempuan": 0,
-    "Laki-laki": 1
-}
-
-cp_map = {
-    "Typical Angina": 0,
-    "Atypical Angina": 1,
-    "Non-anginal Pain": 2,
-    "Asymptomatic": 3
-}
-
-restecg_map = {
-    "Normal": 0,
-    "ST-T Abnormality": 1,
-    "Left Ventricular Hypertrophy": 2
-}
-
-exang_map = {
-    "Tidak": 0,
-    "Ya": 1
-}
-
-slope_map = {
-    "Upsloping": 0,
-    "Flat": 1,
-    "Downsloping": 2
-}
-
-thal_map = {
-    "Fixed Defect": 1,
-    "Normal": 2,
-    "Reversible Defect": 3
-}
+# Sumber mapping ada di utils/encoders.py (dipakai juga untuk file bulk berlabel)
+sex_map     = HEART_LABEL_MAPS["sex"]
+cp_map      = HEART_LABEL_MAPS["chest_pain_type"]
+fbs_map     = HEART_LABEL_MAPS["fasting_blood_sugar"]
+restecg_map = HEART_LABEL_MAPS["resting_electrocardiogram"]
+exang_map   = HEART_LABEL_MAPS["exercise_induced_angina"]
+slope_map   = HEART_LABEL_MAPS["st_slope"]
+thal_map    = HEART_LABEL_MAPS["thalassemia"]
 
 label_map = {
     0: "🟢 Tidak Ada Penyakit Jantung",
     1: "🔴 Ada Penyakit Jantung"
 }
 
+K_NEIGHBORS = 5   # jumlah pasien serupa yang ditampilkan
+
+BULK_COLUMNS = HEART_FEATURES   # kolom untuk prediksi bulk (kode angka atau label seperti di form)
+JOB_POLL_SECONDS = 2   # interval refresh status job latar belakang
+JOB_LIST_LIMIT = 10    # jumlah job terakhir yang ditampilkan
+
 # =========================
 # KONSTANTA: RENTANG NORMAL & RISIKO
 # =========================
@@ -100,6 +106,9 @@ CATEGORICAL_RISK = {
     "st_slope":                     ("Kemiringan ST",                [1, 2]),                  # Flat / Downsloping = risiko
 }
 
+# Urutan bit pada bitmask faktor risiko di record hasil (`utils.results`)
+FLAG_KEYS = list(RISK_THRESHOLDS) + list(CATEGORICAL_RISK)
+
 # =========================
 # REKOMENDASI MEDIS (static)
 # =========================
@@ -212,11 +221,11 @@ with st.form("heart_disease_form"):
     col6, col7, col8 = st.columns(3)
 
     with col6:
-        fasting_blood_sugar = st.selectbox(
+        fbs_display = st.selectbox(
             "Gula Darah Puasa > 120 mg/dl?",
-            ["Tidak", "Ya"]
+            list(fbs_map.keys())
         )
-        fasting_blood_sugar = 1 if fasting_blood_sugar == "Ya" else 0
+        fasting_blood_sugar = fbs_map[fbs_display]
 
     with col7:
         restecg_display = st.selectbox(
@@ -296,16 +305,6 @@ if submit:
     # ── Prediksi & Probabilitas ──
     prediction   = model.predict(input_df)[0]
     probabilities    = model.predict_proba(input_df)[0]
-    prob_no_disease  = probabilities[0] * 100
-    prob_disease     = probabilities[1] * 100
-    confidence       = max(prob_no_disease, prob_disease)
-
-    if confidence >= 80:
-        confidence_label = "🟢 Tinggi"
-    elif confidence >= 60:
-        confidence_label = "🟡 Sedang"
-    else:
-        confidence_label = "🔴 Rendah"
 
     # ================================================================
     # BAGIAN 2 — FLAGGING FAKTOR RISIKO (numerikal + kategorikal)
@@ -336,8 +335,45 @@ if submit:
         if val in risky_vals:
             flagged_keys.append(key)
 
+    # ── Pasien serupa: cari dulu, baru simpan pasien ini ke riwayat ──
+    z_input = explainer.zscores(input_df)
+    neighbors = neighbor_index.query(z_input, k=K_NEIGHBORS)
+    n_history = len(neighbor_index)
+    neighbor_index.add(z_input, [prediction])
+
+    # ── Agregat analitik kohort (halaman Analitik) ──
+    cohort_stats("heart").record(
+        prediction, probabilities,
+        flags=[(RISK_THRESHOLDS.get(k) or CATEGORICAL_RISK[k])[0] for k in flagged_keys],
+    )
+
+    # Sesi hanya menyimpan record ringkas; tabel & chart dibangun ulang dari record ini
+    st.session_state["heart_result"] = HeartResult(
+        input_df[HEART_FEATURES].values[0],
+        probabilities,
+        flags_to_mask(flagged_keys, FLAG_KEYS),
+        explainer.explain(input_df)[0],        # coef * (input - rata-rata referensi)
+        neighbors,
+        n_history,
+    )
+
+result = st.session_state.get("heart_result")
+if result is not None:
+    prediction       = result.prediction
+    prob_no_disease  = result.proba[0] * 100
+    prob_disease     = result.proba[1] * 100
+    confidence       = result.confidence
+    input_data       = result.values
+    flagged_keys     = mask_to_flags(result.flags, FLAG_KEYS)
     total_risk_flags = len(flagged_keys)
 
+    if confidence >= 80:
+        confidence_label = "🟢 Tinggi"
+    elif confidence >= 60:
+        confidence_label = "🟡 Sedang"
+    else:
+        confidence_label = "🔴 Rendah"
+
     # ================================================================
     # TAMPILAN UTAMA
     # ================================================================
@@ -382,107 +418,126 @@ if submit:
     # ================================================================
     # 3. FEATURE IMPORTANCE — Kontribusi Fitur (horizontal bar chart)
     # ================================================================
-    with st.expander("📊 Kontribusi Fitur terhadap Prediksi", expanded=False):
-        st.info(
-            "Chart di bawah menunjukkan **seberapa besar pengaruh setiap fitur** "
-            "terhadap prediksi pada data pasien ini. "
-            "Nilai positif mendorong ke arah 'Ada Penyakit', negatif ke 'Tidak Ada Penyakit'."
-        )
-
-        feature_names = input_df.columns.tolist()
-        coefs          = model.coef_[0]                        # koefisien logistic regression
-        input_values   = input_df.values[0].astype(float)
-        contributions  = coefs * input_values                  # kontribusi per fitur
-
-        # Label tampilan yang lebih readable
-        feature_labels = {
-            "age":                          "Usia",
-            "sex":                          "Jenis Kelamin",
-            "chest_pain_type":              "Tipe Nyeri Dada",
-            "resting_blood_pressure":       "Tekanan Darah Istirahat",
-            "cholesterol":                  "Kolesterol Serum",
-            "fasting_blood_sugar":          "Gula Darah Puasa",
-            "resting_electrocardiogram":    "EKG Istirahat",
-            "max_heart_rate_achieved":      "Detak Jantung Maks",
-            "exercise_induced_angina":      "Angina Olahraga",
-            "st_depression":                "ST Depression",
-            "st_slope":                     "Kemiringan ST",
-            "num_major_vessels":            "Pembuluh Darah Utama",
-            "thalassemia":                  "Thalassemia",
-        }
-        labels = [feature_labels.get(f, f) for f in feature_names]
-
-        # Sortir dari terkecil ke terbesar (horizontal bar)
-        sorted_idx  = np.argsort(contributions)
-        sorted_labels = [labels[i] for i in sorted_idx]
-        sorted_vals   = [contributions[i] for i in sorted_idx]
-
-        # Warna: positif = merah (mendorong "sakit"), negatif = hijau (mendorong "sehat")
-        colors = ["#e74c3c" if v > 0 else "#27ae60" for v in sorted_vals]
-
-        fig = go.Figure(
-            data=[go.Bar(
-                x=sorted_vals,
-                y=sorted_labels,
-                orientation="h",
-                marker_color=colors,
-                text=[f"{v:.3f}" for v in sorted_vals],
-                textposition="outside",
-            )]
-        )
-        fig.update_layout(
-            title="Kontribusi Fitur terhadap Prediksi Penyakit Jantung",
-            xaxis_title="Kontribusi (positif = risiko ↑)",
-            yaxis_title="Fitur",
-            height=480,
-            margin=dict(l=180, r=60, t=60, b=40),
-            template="plotly_white",
-        )
-        fig.add_vline(x=0, line_dash="dash", line_color="gray", line_width=1)
-
-        st.plotly_chart(fig, use_container_width=True)
-
-        # Tabel kontribusi
-        contrib_df = pd.DataFrame({
-            "Fitur":         labels,
-            "Nilai Input":  input_values,
-            "Koefisien":    coefs,
-            "Kontribusi":   contributions
-        }).sort_values("Kontribusi", ascending=False).reset_index(drop=True)
-        contrib_df.index = contrib_df.index + 1   # mulai dari 1
-
-        with st.expander("📋 Lihat Tabel Detail Kontribusi"):
-            st.dataframe(contrib_df, use_container_width=True)
+    # Expander di bawah ini hanya membangun chart / tabel saat dibuka (`.open`)
+    contrib_expander = st.expander(
+        "📊 Kontribusi Fitur terhadap Prediksi", expanded=False, key="heart_contrib", on_change="rerun"
+    )
+    if contrib_expander.open:
+        with contrib_expander:
+            st.info(
+                "Chart di bawah menunjukkan **seberapa besar pengaruh setiap fitur** "
+                "terhadap prediksi pada data pasien ini, **dibandingkan dengan pasien rata-rata**. "
+                "Nilai positif mendorong ke arah 'Ada Penyakit', negatif ke 'Tidak Ada Penyakit'."
+            )
+
+            feature_names  = explainer.feature_names
+            contributions  = result.contributions
+
+            # Label tampilan yang lebih readable
+            feature_labels = {
+                "age":                          "Usia",
+                "sex":                          "Jenis Kelamin",
+                "chest_pain_type":              "Tipe Nyeri Dada",
+                "resting_blood_pressure":       "Tekanan Darah Istirahat",
+                "cholesterol":                  "Kolesterol Serum",
+                "fasting_blood_sugar":          "Gula Darah Puasa",
+                "resting_electrocardiogram":    "EKG Istirahat",
+                "max_heart_rate_achieved":      "Detak Jantung Maks",
+                "exercise_induced_angina":      "Angina Olahraga",
+                "st_depression":                "ST Depression",
+                "st_slope":                     "Kemiringan ST",
+                "num_major_vessels":            "Pembuluh Darah Utama",
+                "thalassemia":                  "Thalassemia",
+            }
+            labels = [feature_labels.get(f, f) for f in feature_names]
+
+            # Spec figure di-cache per input; layout (template, garis nol) dibangun sekali per proses
+            fig = contribution_bar(
+                tuple(result.inputs),
+                labels,
+                contributions,
+                title="Kontribusi Fitur terhadap Prediksi Penyakit Jantung",
+                xaxis_title="Kontribusi vs. rata-rata (positif = risiko ↑)",
+                height=480,
+                margin_left=180,
+            )
+
+            st.plotly_chart(fig, use_container_width=True)
+            st.caption(
+                f"Log-odds pasien rata-rata: {explainer.expected_value:.3f} — "
+                f"log-odds pasien ini: {explainer.expected_value + contributions.sum():.3f}"
+            )
+
+            # Tabel kontribusi
+            table_expander = st.expander("📋 Lihat Tabel Detail Kontribusi", key="heart_contrib_table", on_change="rerun")
+            if table_expander.open:
+                contrib_df = pd.DataFrame({
+                    "Fitur":            labels,
+                    "Nilai Input":      result.inputs,
+                    "Rata-rata Ref.":   explainer.mean,
+                    "Z-Score":          explainer.zscores(result.inputs[None])[0],
+                    "Koefisien":        explainer.coef,
+                    "Kontribusi":       contributions
+                }).sort_values("Kontribusi", ascending=False).reset_index(drop=True)
+                contrib_df.index = contrib_df.index + 1   # mulai dari 1
+                table_expander.dataframe(contrib_df, use_container_width=True)
 
     # ================================================================
     # 5. PERBANDINGAN RENTANG NORMAL
     # ================================================================
-    with st.expander("📋 Perbandingan dengan Rentang Normal", expanded=False):
-        st.info("Tabel berikut membandingkan nilai input pasien dengan rentang normal standar medis.")
-
-        comparison_rows = []
-        for key, (nama, min_n, max_n, unit) in NORMAL_RANGES.items():
-            val = input_data[key]
-            if min_n is not None and max_n is not None:
-                normal_str = f"{min_n} – {max_n} {unit}"
-                if val < min_n:
-                    status = "🔵 Di bawah normal"
-                elif val > max_n:
-                    status = "🔴 Di atas normal"
+    comparison_expander = st.expander(
+        "📋 Perbandingan dengan Rentang Normal", expanded=False, key="heart_comparison", on_change="rerun"
+    )
+    if comparison_expander.open:
+        with comparison_expander:
+            st.info("Tabel berikut membandingkan nilai input pasien dengan rentang normal standar medis.")
+
+            comparison_rows = []
+            for key, (nama, min_n, max_n, unit) in NORMAL_RANGES.items():
+                val = input_data[key]
+                if min_n is not None and max_n is not None:
+                    normal_str = f"{min_n} – {max_n} {unit}"
+                    if val < min_n:
+                        status = "🔵 Di bawah normal"
+                    elif val > max_n:
+                        status = "🔴 Di atas normal"
+                    else:
+                        status = "🟢 Normal"
                 else:
-                    status = "🟢 Normal"
+                    normal_str = "—"
+                    status     = "—"
+                comparison_rows.append({
+                    "Parameter":        nama,
+                    "Nilai Pasien":     f"{val:g} {unit}",
+                    "Rentang Normal":   normal_str,
+                    "Status":           status,
+                })
+
+            comparison_df = pd.DataFrame(comparison_rows)
+            st.dataframe(comparison_df, use_container_width=True, hide_index=True)
+
+    # ================================================================
+    # 7. PASIEN SERUPA (nearest neighbour dari riwayat prediksi)
+    # ================================================================
+    similar_expander = st.expander(
+        "👥 Pasien Serupa dari Riwayat Prediksi", expanded=False, key="heart_similar", on_change="rerun"
+    )
+    if similar_expander.open:
+        with similar_expander:
+            if len(result.nb_labels) == 0:
+                st.info("Belum ada riwayat pasien yang tersimpan.")
             else:
-                normal_str = "—"
-                status     = "—"
-            comparison_rows.append({
-                "Parameter":        nama,
-                "Nilai Pasien":     f"{val} {unit}",
-                "Rentang Normal":   normal_str,
-                "Status":           status,
-            })
-
-        comparison_df = pd.DataFrame(comparison_rows)
-        st.dataframe(comparison_df, use_container_width=True, hide_index=True)
+                st.info(
+                    f"{len(result.nb_labels)} pasien dengan data paling mirip (jarak fitur terstandarisasi) "
+                    f"dari {result.n_history:,} riwayat prediksi."
+                )
+                # Kembalikan ke satuan asli untuk ditampilkan
+                nb_values = result.nb_vectors * explainer.std + explainer.mean
+                similar_df = pd.DataFrame(nb_values.round(1), columns=explainer.feature_names)
+                similar_df.insert(0, "Hasil Prediksi", [label_map[int(l)] for l in result.nb_labels])
+                similar_df.insert(1, "Jarak", result.nb_dist.round(3))
+                similar_df.index = similar_df.index + 1
+                st.dataframe(similar_df, use_container_width=True)
 
     # ================================================================
     # 6. SARAN GAYA HIDUP (dinamis berdasarkan flagged risk)
@@ -501,5 +556,104 @@ if submit:
     # ================================================================
     # RAW INPUT
     # ================================================================
-    with st.expander("🔍 Lihat Data Input (Numerik)"):
-        st.dataframe(input_df, use_container_width=True)
\ No newline at end of file
+    input_expander = st.expander("🔍 Lihat Data Input (Numerik)", key="heart_input", on_change="rerun")
+    if input_expander.open:
+        input_expander.dataframe(result.input_frame(), use_container_width=True)
+
+# =========================
+# PREDIKSI BULK (FILE)
+# =========================
+# Status job dibaca ulang dari disk secara berkala tanpa rerun seluruh halaman
+@st.fragment(run_every=JOB_POLL_SECONDS)
+def show_jobs():
+    job_runner()   # job yang tertunda (mis. setelah restart server) otomatis dilanjutkan
+    jobs = list_jobs("heart")[:JOB_LIST_LIMIT]
+    if not jobs:
+        return
+    st.markdown("**Job latar belakang**")
+    for job in jobs:
+        col_info, col_action = st.columns([5, 1])
+        with col_info:
+            total = job["total_rows"]
+            text = f"`{job['name']}` — {job['status']} · {job['rows_done']:,} / {f'{total:,}' if total else '?'} baris"
+            if job["n_rejected"]:
+                text += f" · {job['n_rejected']:,} ditolak"
+            st.progress(job["rows_done"] / total if total else 0.0, text=text)
+            if job["error"]:
+                st.error(job["error"])
+        with col_action:
+            if job["status"] == STATUS_DONE:
+                st.download_button(
+                    "⬇️ Hasil", data=lambda path=result_path(job): pathlib.Path(path).read_bytes(),
+                    file_name=f"hasil_heart_{job['id']}.{job['fmt']}", key=f"dl_{job['id']}",
+                )
+            if job["status"] in FINAL_STATUSES:
+                if st.button("🗑️ Hapus", key=f"del_{job['id']}"):
+                    delete_job(job["id"])
+                    st.rerun(scope="fragment")
+            elif st.button("⏹️ Batal", key=f"cancel_{job['id']}"):
+                cancel_job(job["id"])
+
+st.markdown("---")
+# Status job hanya di-poll selama expander terbuka (bukan di setiap sesi yang aktif)
+bulk_expander = st.expander(
+    "📂 Prediksi Bulk dari File (CSV / Parquet / Arrow)", key="heart_bulk", on_change="rerun"
+)
+with bulk_expander:
+    st.markdown(
+        "File dibaca per batch dan hanya kolom berikut yang dipakai: "
+        + ", ".join(f"`{c}`" for c in BULK_COLUMNS)
+        + ". Kolom kategorikal boleh berisi kode angka atau label seperti di form "
+        "(mis. `Typical Angina`, `Reversible Defect`)."
+    )
+    bulk_file = st.file_uploader(
+        "Upload file pasien", type=["csv", "parquet", "arrow", "feather"], key="heart_bulk_file"
+    )
+    bulk_fmt = st.radio("Format hasil", ["parquet", "csv"], horizontal=True, key="heart_bulk_fmt")
+    bulk_float32 = st.checkbox(
+        "Mode hemat memori (float32)", key="heart_bulk_float32",
+        help=(
+            "Untuk file sangat besar. Selisih probabilitas < 1e-6 dari mode normal; label sama untuk "
+            "≥ 99,99% baris pada pengujian (cek model lain dengan `utils.precision.compare_precision`)."
+        ),
+    )
+
+    if bulk_file is not None and st.button("🔮 Prediksi File", key="heart_bulk_submit"):
+        bulk_status = st.empty()
+
+        # Hasil ditulis bertahap ke file sementara, bukan ditumpuk di memori
+        with tempfile.NamedTemporaryFile(suffix=f".{bulk_fmt}", delete=False) as tmp:
+            bulk_out_path = tmp.name
+        try:
+            with ResultSink(bulk_out_path, bulk_fmt) as sink:
+                n_rows, n_rejected = score_file(
+                    model, "heart", bulk_file, sink,
+                    on_batch=lambda n: bulk_status.info(f"⏳ {n:,} baris diproses..."),
+                    precision="float32" if bulk_float32 else "float64",
+                    on_result=lambda result: cohort_stats("heart").add_summary(cohort_summary(result, "heart")),
+                )
+        except Exception as exc:   # file rusak / kolom tidak cocok / tipe tidak valid
+            bulk_status.error(f"❌ File gagal diproses: {exc}")
+        else:
+            if n_rejected:
+                bulk_status.warning(
+                    f"{n_rows:,} baris diproses — **{n_rejected:,} baris ditolak** "
+                    "(lihat kolom `alasan_ditolak` di file hasil)."
+                )
+            else:
+                bulk_status.success(f"✅ {n_rows:,} baris berhasil diprediksi.")
+
+            with open(bulk_out_path, "rb") as f:
+                st.download_button(
+                    "⬇️ Download Hasil", f, file_name=f"hasil_heart.{bulk_fmt}", use_container_width=True
+                )
+        finally:
+            os.remove(bulk_out_path)
+
+    # File besar: diproses worker per chunk, tahan refresh / disconnect / restart server
+    if bulk_file is not None and st.button("📥 Jalankan di Latar Belakang", key="heart_bulk_job"):
+        job_id = submit_job("heart", bulk_file, bulk_fmt, "float32" if bulk_float32 else "float64")
+        st.success(f"✅ Job `{job_id}` masuk antrean — progress tampil di bawah.")
+
+    if bulk_expander.open:
+        show_jobs()
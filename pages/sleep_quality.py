@@ -1,7 +1,24 @@
 import streamlit as st
 import pandas as pd
+import os
+import pathlib
+import tempfile
 import joblib
-import plotly.graph_objects as go
+
+from utils.analytics import cohort_stats
+from utils.charts import contribution_bar, probability_bar
+from utils.encoders import SLEEP_LABEL_MAPS
+from utils.explain import SleepTreeExplainer
+from utils.ingest import ResultSink, score_file
+from utils.jobs import (
+    FINAL_STATUSES, STATUS_DONE, cancel_job, delete_job, job_runner, list_jobs, result_path, submit_job,
+)
+from utils.models import SLEEP_FEATURES
+from utils.neighbors import NEIGHBORS_DIR, NeighborIndex
+from utils.postprocess import sleep_postprocess
+from utils.results import SleepResult, flags_to_mask, mask_to_flags
+from utils.schema import SLEEP_BODY_SCHEMA
+from utils.scoring import cohort_summary
 
 # =========================
 # CONFIG
@@ -14,13 +31,54 @@ st.markdown("---")
 # =========================
 # LOAD MODEL
 # =========================
-model = joblib.load("models/adaboost_sleep_model.pkl")
+@st.cache_resource
+def load_model():
+    return joblib.load("models/adaboost_sleep_model.pkl")
+
+# Array pohon yang sudah diratakan cukup dibangun sekali per proses
+@st.cache_resource
+def load_explainer(_model):
+    return SleepTreeExplainer(_model)
+
+# Index pasien serupa dibagi antar sesi (satu KD-tree per proses)
+@st.cache_resource
+def load_neighbor_index():
+    return NeighborIndex(os.path.join(NEIGHBORS_DIR, "sleep"), n_features=11)
+
+model = load_model()
+explainer = load_explainer(model)
+neighbor_index = load_neighbor_index()
 
 # =========================
 # KONSTANTA
 # =========================
 LABEL_MAP = {0: "Sehat", 1: "Insomnia", 2: "Sleep Apnea"}
 
+# Sumber mapping ada di utils/encoders.py (dipakai juga untuk file bulk berlabel)
+gender_map = SLEEP_LABEL_MAPS["Gender"]
+
+K_NEIGHBORS = 5   # jumlah pasien serupa yang ditampilkan
+
+# Kolom untuk prediksi bulk; Height_cm & Weight_kg opsional (untuk BMI)
+BULK_COLUMNS = SLEEP_FEATURES + list(SLEEP_BODY_SCHEMA)
+JOB_POLL_SECONDS = 2   # interval refresh status job latar belakang
+JOB_LIST_LIMIT = 10    # jumlah job terakhir yang ditampilkan
+
+# Label tampilan untuk kolom input model
+FEATURE_LABELS = {
+    "Gender":             "Gender",
+    "Age":                "Usia",
+    "Occupation":         "Kode Pekerjaan",
+    "Sleep_Duration":     "Durasi Tidur",
+    "Quality_of_Sleep":   "Kualitas Tidur",
+    "Physical_Activity":  "Aktivitas Fisik",
+    "Stress_Level":       "Tingkat Stres",
+    "Heart_Rate":         "Heart Rate",
+    "Daily_Steps":        "Daily Steps",
+    "Systolic_BP":        "Systolic BP",
+    "Diastolic_BP":       "Diastolic BP",
+}
+
 # Rentang normal per parameter: (nama tampil, min, max, unit)
 NORMAL_RANGES = {
     "Usia":                  (None,  None,  "Tahun"),
@@ -48,6 +106,10 @@ RISK_FLAGS_CONFIG = [
     ("Diastolic BP",     lambda v: v > 90,                 "Tekanan darah diastolik tinggi — konsultasikan dengan dokter."),
     ("BMI",              lambda v: v < 18.5 or v > 24.9,   "BMI di luar rentang normal — berisiko mempengaruhi kualitas tidur."),
 ]
+RISK_DESCRIPTIONS = {nama: deskripsi for (nama, _, deskripsi) in RISK_FLAGS_CONFIG}
+
+# Urutan bit pada bitmask faktor risiko di record hasil (`utils.results`)
+FLAG_KEYS = [nama for (nama, _, _) in RISK_FLAGS_CONFIG]
 
 # =========================
 # REKOMENDASI MEDIS per hasil prediksi
@@ -182,7 +244,7 @@ with st.form("sleep_form"):
     col1, col2, col3 = st.columns(3)
 
     with col1:
-        gender = st.selectbox("Gender", ["Perempuan", "Laki-laki"])
+        gender = st.selectbox("Gender", list(gender_map.keys()))
     with col2:
         age = st.number_input("Usia", 10, 100, 30)
     with col3:
@@ -228,22 +290,9 @@ with st.form("sleep_form"):
 # PREDIKSI + SEMUA FITUR
 # =========================
 if submit:
-    # ── Hitung BMI ──
-    height_m = height_cm / 100
-    bmi = weight_kg / (height_m ** 2)
-
-    if bmi < 18.5:
-        bmi_category = "Underweight"
-    elif bmi < 25:
-        bmi_category = "Normal"
-    elif bmi < 30:
-        bmi_category = "Overweight"
-    else:
-        bmi_category = "Obese"
-
     # ── Bangun DataFrame input untuk model ──
     input_df = pd.DataFrame([[
-        1 if gender == "Laki-laki" else 0,
+        gender_map[gender],
         age,
         occupation,
         sleep_duration,
@@ -263,53 +312,14 @@ if submit:
     # ── Prediksi & Probabilitas (multiclass) ──
     pred          = model.predict(input_df)[0]
     probabilities = model.predict_proba(input_df)[0]   # array 3 elemen: [Sehat, Insomnia, Sleep Apnea]
-    pred_label    = LABEL_MAP[pred]
-    confidence    = probabilities[pred] * 100          # confidence = probabilitas kelas yang dipilih
-
-    # Probabilitas per kelas dalam persen
-    prob_dict = {LABEL_MAP[i]: round(probabilities[i] * 100, 2) for i in range(len(probabilities))}
-
-    # ── Label kepercayaan ──
-    if confidence >= 80:
-        confidence_label = "🟢 Tinggi"
-    elif confidence >= 60:
-        confidence_label = "🟡 Sedang"
-    else:
-        confidence_label = "🔴 Rendah"
 
-    # ================================================================
-    # A2 — KATEGORI KEPARAHAN
-    # ================================================================
-    if pred == 0:   # Sehat
-        severity = "✅ Sehat"
-    else:
-        # Logic: gabungan confidence + quality_of_sleep + stress_level
-        severity_score = 0
-        if confidence >= 80:
-            severity_score += 2
-        elif confidence >= 60:
-            severity_score += 1
-
-        if quality_of_sleep <= 3:
-            severity_score += 2
-        elif quality_of_sleep <= 5:
-            severity_score += 1
-
-        if stress_level >= 8:
-            severity_score += 2
-        elif stress_level >= 6:
-            severity_score += 1
-
-        if sleep_duration < 5:
-            severity_score += 1
-
-        # Mapping score -> label
-        if severity_score <= 2:
-            severity = "🟡 Ringan"
-        elif severity_score <= 4:
-            severity = "🟠 Sedang"
-        else:
-            severity = "🔴 Berat"
+    # ── BMI, confidence & keparahan: fungsi yang sama dengan jalur bulk (N=1) ──
+    post = sleep_postprocess(
+        [height_cm], [weight_kg], [probabilities],
+        [quality_of_sleep], [stress_level], [sleep_duration],
+    )
+    bmi           = post["bmi"][0]
+    severity      = post["severity"][0]               # A2 — kategori keparahan
 
     # ================================================================
     # B4 — FLAGGING FAKTOR RISIKO
@@ -326,14 +336,53 @@ if submit:
         "BMI":              bmi,
     }
 
-    flagged = []   # list of (nama, deskripsi_risiko)
+    flagged = []   # list of nama faktor risiko
     for (nama, cond_fn, deskripsi) in RISK_FLAGS_CONFIG:
         val = input_values_for_flag.get(nama)
         if val is not None and cond_fn(val):
-            flagged.append((nama, deskripsi))
+            flagged.append(nama)
+
+    # ── Pasien serupa: distandarisasi dengan scaler milik Pipeline ──
+    z_input = model[:-1].transform(input_df)
+    neighbors = neighbor_index.query(z_input, k=K_NEIGHBORS)
+    n_history = len(neighbor_index)
+    neighbor_index.add(z_input, [pred])
+
+    # ── Agregat analitik kohort (halaman Analitik) ──
+    cohort_stats("sleep").record(pred, probabilities, flags=flagged, severity=severity)
+
+    # Sesi hanya menyimpan record ringkas; tabel & chart dibangun ulang dari record ini
+    st.session_state["sleep_result"] = SleepResult(
+        input_df[SLEEP_FEATURES].values[0],
+        probabilities,
+        flags_to_mask(flagged, FLAG_KEYS),
+        explainer.explain(input_df)[0],          # (n_fitur, n_kelas)
+        neighbors,
+        n_history,
+        bmi,
+        severity,
+    )
 
+result = st.session_state.get("sleep_result")
+if result is not None:
+    pred             = result.prediction
+    pred_label       = LABEL_MAP[pred]
+    confidence       = result.confidence        # confidence = probabilitas kelas yang dipilih
+    severity         = result.severity
+    flagged          = [(nama, RISK_DESCRIPTIONS[nama]) for nama in mask_to_flags(result.flags, FLAG_KEYS)]
     total_risk_flags = len(flagged)
 
+    # Probabilitas per kelas dalam persen
+    prob_dict = {LABEL_MAP[i]: round(result.proba[i] * 100, 2) for i in range(len(result.proba))}
+
+    # ── Label kepercayaan ──
+    if confidence >= 80:
+        confidence_label = "🟢 Tinggi"
+    elif confidence >= 60:
+        confidence_label = "🟡 Sedang"
+    else:
+        confidence_label = "🔴 Rendah"
+
     # ================================================================
     # TAMPILAN UTAMA
     # ================================================================
@@ -368,25 +417,7 @@ if submit:
     values  = list(prob_dict.values())
     colors  = ["#27ae60" if c == "Sehat" else "#e67e22" if c == "Insomnia" else "#e74c3c" for c in classes]
 
-    fig = go.Figure(
-        data=[go.Bar(
-            x=classes,
-            y=values,
-            marker_color=colors,
-            text=[f"{v:.2f}%" for v in values],
-            textposition="outside",
-            width=0.45,
-        )]
-    )
-    fig.update_layout(
-        title="Distribusi Probabilitas per Kelas",
-        yaxis_title="Probabilitas (%)",
-        yaxis=dict(range=[0, 110]),
-        xaxis_title="Kategori",
-        height=350,
-        template="plotly_white",
-        margin=dict(l=40, r=40, t=60, b=40),
-    )
+    fig = probability_bar(tuple(values), classes, values, colors)
     st.plotly_chart(fig, use_container_width=True)
 
     # Detail probabilitas per kelas (metric)
@@ -401,6 +432,45 @@ if submit:
         st.metric(label="🔴 Sleep Apnea", value=f"{prob_dict['Sleep Apnea']:.2f}%")
         st.progress(prob_dict["Sleep Apnea"] / 100)
 
+    # ================================================================
+    # A4 — KONTRIBUSI FITUR PER KELAS (Saabas / TreeSHAP)
+    # ================================================================
+    # Expander di bawah ini hanya membangun chart / tabel saat dibuka (`.open`)
+    contrib_expander = st.expander(
+        "📊 Kontribusi Fitur terhadap Prediksi", expanded=False, key="sleep_contrib", on_change="rerun"
+    )
+    if contrib_expander.open:
+        with contrib_expander:
+            st.info(
+                "Chart di bawah menunjukkan **seberapa besar pengaruh setiap fitur** "
+                "terhadap skor setiap kelas pada data pasien ini, dihitung dari jalur keputusan "
+                "semua pohon AdaBoost. Nilai positif mendorong ke arah kelas tersebut, negatif menjauhinya."
+            )
+
+            contributions = result.contributions
+            labels = [FEATURE_LABELS.get(f, f) for f in result.features]
+
+            tabs = st.tabs([LABEL_MAP[c] for c in explainer.classes_])
+            for k, (tab, cls) in enumerate(zip(tabs, explainer.classes_)):
+                with tab:
+                    contrib_k = contributions[:, k]
+
+                    fig = contribution_bar(
+                        (tuple(result.inputs), k),
+                        labels,
+                        contrib_k,
+                        title=f"Kontribusi Fitur terhadap Kelas {LABEL_MAP[cls]}",
+                        xaxis_title=f"Kontribusi (positif = {LABEL_MAP[cls]} ↑)",
+                        height=440,
+                        margin_left=160,
+                    )
+
+                    st.plotly_chart(fig, use_container_width=True)
+                    st.caption(
+                        f"Skor dasar kelas: {explainer.expected_value[k]:.3f} — "
+                        f"skor pasien: {explainer.expected_value[k] + contrib_k.sum():.3f}"
+                    )
+
 
     # ================================================================
     # B4 — FAKTOR RISIKO TERDETEKSI
@@ -418,45 +488,76 @@ if submit:
     # ================================================================
     # B5 — PERBANDINGAN RENTANG NORMAL
     # ================================================================
-    with st.expander("📋 Perbandingan dengan Rentang Normal", expanded=False):
-        st.info("Tabel berikut membandingkan nilai input pasien dengan rentang normal standar kesehatan.")
-
-        # Mapping nama -> nilai pasien
-        patient_values = {
-            "Usia":             age,
-            "Durasi Tidur":     sleep_duration,
-            "Kualitas Tidur":   quality_of_sleep,
-            "Aktivitas Fisik":  physical_activity,
-            "Tingkat Stres":    stress_level,
-            "Heart Rate":       heart_rate,
-            "Daily Steps":      daily_steps,
-            "Systolic BP":      systolic_bp,
-            "Diastolic BP":     diastolic_bp,
-            "BMI":              round(bmi, 1),
-        }
-
-        rows = []
-        for param, (min_n, max_n, unit) in NORMAL_RANGES.items():
-            val = patient_values[param]
-            if min_n is not None and max_n is not None:
-                normal_str = f"{min_n} – {max_n} {unit}"
-                if val < min_n:
-                    status = "🔵 Di bawah normal"
-                elif val > max_n:
-                    status = "🔴 Di atas normal"
+    comparison_expander = st.expander(
+        "📋 Perbandingan dengan Rentang Normal", expanded=False, key="sleep_comparison", on_change="rerun"
+    )
+    if comparison_expander.open:
+        with comparison_expander:
+            st.info("Tabel berikut membandingkan nilai input pasien dengan rentang normal standar kesehatan.")
+
+            # Mapping nama -> nilai pasien
+            inputs = result.values
+            patient_values = {
+                "Usia":             inputs["Age"],
+                "Durasi Tidur":     inputs["Sleep_Duration"],
+                "Kualitas Tidur":   inputs["Quality_of_Sleep"],
+                "Aktivitas Fisik":  inputs["Physical_Activity"],
+                "Tingkat Stres":    inputs["Stress_Level"],
+                "Heart Rate":       inputs["Heart_Rate"],
+                "Daily Steps":      inputs["Daily_Steps"],
+                "Systolic BP":      inputs["Systolic_BP"],
+                "Diastolic BP":     inputs["Diastolic_BP"],
+                "BMI":              round(result.bmi, 1),
+            }
+
+            rows = []
+            for param, (min_n, max_n, unit) in NORMAL_RANGES.items():
+                val = patient_values[param]
+                if min_n is not None and max_n is not None:
+                    normal_str = f"{min_n} – {max_n} {unit}"
+                    if val < min_n:
+                        status = "🔵 Di bawah normal"
+                    elif val > max_n:
+                        status = "🔴 Di atas normal"
+                    else:
+                        status = "🟢 Normal"
                 else:
-                    status = "🟢 Normal"
-            else:
-                normal_str = "—"
-                status     = "—"
-            rows.append({
-                "Parameter":        param,
-                "Nilai Pasien":     f"{val} {unit}",
-                "Rentang Normal":   normal_str,
-                "Status":           status,
-            })
+                    normal_str = "—"
+                    status     = "—"
+                rows.append({
+                    "Parameter":        param,
+                    "Nilai Pasien":     f"{val:g} {unit}",
+                    "Rentang Normal":   normal_str,
+                    "Status":           status,
+                })
 
-        st.dataframe(pd.DataFrame(rows), use_container_width=True, hide_index=True)
+            st.dataframe(pd.DataFrame(rows), use_container_width=True, hide_index=True)
+
+    # ================================================================
+    # B6 — PASIEN SERUPA (nearest neighbour dari riwayat prediksi)
+    # ================================================================
+    similar_expander = st.expander(
+        "👥 Pasien Serupa dari Riwayat Prediksi", expanded=False, key="sleep_similar", on_change="rerun"
+    )
+    if similar_expander.open:
+        with similar_expander:
+            if len(result.nb_labels) == 0:
+                st.info("Belum ada riwayat pasien yang tersimpan.")
+            else:
+                st.info(
+                    f"{len(result.nb_labels)} pasien dengan data paling mirip (jarak fitur terstandarisasi) "
+                    f"dari {result.n_history:,} riwayat prediksi."
+                )
+                # Kembalikan ke satuan asli untuk ditampilkan (scaler milik Pipeline)
+                nb_values = model[:-1].inverse_transform(result.nb_vectors)
+                similar_df = pd.DataFrame(
+                    nb_values.round(1),
+                    columns=[FEATURE_LABELS[c] for c in result.features],
+                )
+                similar_df.insert(0, "Hasil Prediksi", [LABEL_MAP[int(l)] for l in result.nb_labels])
+                similar_df.insert(1, "Jarak", result.nb_dist.round(3))
+                similar_df.index = similar_df.index + 1
+                st.dataframe(similar_df, use_container_width=True)
 
     # ================================================================
     # C7 — REKOMENDASI MEDIS
@@ -497,5 +598,103 @@ if submit:
     # ================================================================
     # RAW INPUT
     # ================================================================
-    with st.expander("🔍 Lihat Data Input (Numerik)"):
-        st.dataframe(input_df, use_container_width=True)
\ No newline at end of file
+    input_expander = st.expander("🔍 Lihat Data Input (Numerik)", key="sleep_input", on_change="rerun")
+    if input_expander.open:
+        input_expander.dataframe(result.input_frame(), use_container_width=True)
+
+# =========================
+# PREDIKSI BULK (FILE)
+# =========================
+# Status job dibaca ulang dari disk secara berkala tanpa rerun seluruh halaman
+@st.fragment(run_every=JOB_POLL_SECONDS)
+def show_jobs():
+    job_runner()   # job yang tertunda (mis. setelah restart server) otomatis dilanjutkan
+    jobs = list_jobs("sleep")[:JOB_LIST_LIMIT]
+    if not jobs:
+        return
+    st.markdown("**Job latar belakang**")
+    for job in jobs:
+        col_info, col_action = st.columns([5, 1])
+        with col_info:
+            total = job["total_rows"]
+            text = f"`{job['name']}` — {job['status']} · {job['rows_done']:,} / {f'{total:,}' if total else '?'} baris"
+            if job["n_rejected"]:
+                text += f" · {job['n_rejected']:,} ditolak"
+            st.progress(job["rows_done"] / total if total else 0.0, text=text)
+            if job["error"]:
+                st.error(job["error"])
+        with col_action:
+            if job["status"] == STATUS_DONE:
+                st.download_button(
+                    "⬇️ Hasil", data=lambda path=result_path(job): pathlib.Path(path).read_bytes(),
+                    file_name=f"hasil_sleep_{job['id']}.{job['fmt']}", key=f"dl_{job['id']}",
+                )
+            if job["status"] in FINAL_STATUSES:
+                if st.button("🗑️ Hapus", key=f"del_{job['id']}"):
+                    delete_job(job["id"])
+                    st.rerun(scope="fragment")
+            elif st.button("⏹️ Batal", key=f"cancel_{job['id']}"):
+                cancel_job(job["id"])
+
+st.markdown("---")
+# Status job hanya di-poll selama expander terbuka (bukan di setiap sesi yang aktif)
+bulk_expander = st.expander(
+    "📂 Prediksi Bulk dari File (CSV / Parquet / Arrow)", key="sleep_bulk", on_change="rerun"
+)
+with bulk_expander:
+    st.markdown(
+        "File dibaca per batch dan hanya kolom berikut yang dipakai: "
+        + ", ".join(f"`{c}`" for c in BULK_COLUMNS)
+        + ". Kolom `Gender` boleh berisi kode angka atau label (`Perempuan` / `Laki-laki`)."
+    )
+    bulk_file = st.file_uploader(
+        "Upload file pasien", type=["csv", "parquet", "arrow", "feather"], key="sleep_bulk_file"
+    )
+    bulk_fmt = st.radio("Format hasil", ["parquet", "csv"], horizontal=True, key="sleep_bulk_fmt")
+    bulk_float32 = st.checkbox(
+        "Mode hemat memori (float32)", key="sleep_bulk_float32",
+        help=(
+            "Untuk file sangat besar. Selisih probabilitas < 1e-6 dari mode normal; label sama untuk "
+            "≥ 99,99% baris pada pengujian (cek model lain dengan `utils.precision.compare_precision`)."
+        ),
+    )
+
+    if bulk_file is not None and st.button("🔮 Prediksi File", key="sleep_bulk_submit"):
+        bulk_status = st.empty()
+
+        # Hasil ditulis bertahap ke file sementara, bukan ditumpuk di memori
+        with tempfile.NamedTemporaryFile(suffix=f".{bulk_fmt}", delete=False) as tmp:
+            bulk_out_path = tmp.name
+        try:
+            with ResultSink(bulk_out_path, bulk_fmt) as sink:
+                n_rows, n_rejected = score_file(
+                    model, "sleep", bulk_file, sink,
+                    on_batch=lambda n: bulk_status.info(f"⏳ {n:,} baris diproses..."),
+                    precision="float32" if bulk_float32 else "float64",
+                    on_result=lambda result: cohort_stats("sleep").add_summary(cohort_summary(result, "sleep")),
+                )
+        except Exception as exc:   # file rusak / kolom tidak cocok / tipe tidak valid
+            bulk_status.error(f"❌ File gagal diproses: {exc}")
+        else:
+            if n_rejected:
+                bulk_status.warning(
+                    f"{n_rows:,} baris diproses — **{n_rejected:,} baris ditolak** "
+                    "(lihat kolom `alasan_ditolak` di file hasil)."
+                )
+            else:
+                bulk_status.success(f"✅ {n_rows:,} baris berhasil diprediksi.")
+
+            with open(bulk_out_path, "rb") as f:
+                st.download_button(
+                    "⬇️ Download Hasil", f, file_name=f"hasil_sleep.{bulk_fmt}", use_container_width=True
+                )
+        finally:
+            os.remove(bulk_out_path)
+
+    # File besar: diproses worker per chunk, tahan refresh / disconnect / restart server
+    if bulk_file is not None and st.button("📥 Jalankan di Latar Belakang", key="sleep_bulk_job"):
+        job_id = submit_job("sleep", bulk_file, bulk_fmt, "float32" if bulk_float32 else "float64")
+        st.success(f"✅ Job `{job_id}` masuk antrean — progress tampil di bawah.")
+
+    if bulk_expander.open:
+        show_jobs()
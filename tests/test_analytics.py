@@ -0,0 +1,47 @@
+"""Ringkasan batch bulk di agregat kohort."""
+
+import datetime
+
+import numpy as np
+
+from utils.analytics import CohortStats
+from utils.encoders import CLASS_LABELS
+from utils.ingest import score_file
+from utils.models import load_sleep_model
+from utils.precision import random_frame
+from utils.scoring import PROBA_COLUMNS, cohort_summary
+
+
+class _ListSink:
+    def __init__(self):
+        self.frames = []
+
+    def write(self, frame):
+        self.frames.append(frame)
+
+
+def test_bulk_batches_match_row_by_row_aggregates(tmp_path):
+    frame = random_frame("sleep", 5_000, seed=3)
+    frame.loc[::7, "Stress_Level"] = 99   # sebagian baris ditolak skema
+    path = tmp_path / "tidur.parquet"
+    frame.to_parquet(path)
+
+    day = datetime.date(2026, 1, 1)
+    bulk = CohortStats(str(tmp_path / "bulk.json"), CLASS_LABELS["sleep"])
+    sink = _ListSink()
+    score_file(
+        load_sleep_model(), "sleep", str(path), sink, batch_rows=1_000,
+        on_result=lambda result: bulk.add_summary(cohort_summary(result, "sleep"), when=day),
+    )
+
+    rows = CohortStats(str(tmp_path / "rows.json"), CLASS_LABELS["sleep"])
+    for result in sink.frames:
+        for _, r in result[result["prediksi"].notna()].iterrows():
+            rows.record(r["prediksi"], r[PROBA_COLUMNS["sleep"]], severity=r["keparahan"], when=day)
+
+    got, expected = bulk.totals(), rows.totals()
+    assert got["n"] == expected["n"] == 5_000 - len(frame.index[::7])
+    assert got["n_form"] == 0
+    assert got["classes"] == expected["classes"]
+    assert got["severity"] == expected["severity"]
+    np.testing.assert_allclose(got["prob_mean"], expected["prob_mean"])
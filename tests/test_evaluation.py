@@ -0,0 +1,30 @@
+"""Metrik `StreamingEvaluator` dibandingkan dengan perhitungan sklearn."""
+
+import numpy as np
+import pytest
+from sklearn.metrics import brier_score_loss, log_loss
+
+from utils.evaluation import StreamingEvaluator
+
+
+def _random_batch(rng, n, k):
+    proba = rng.dirichlet(np.ones(k), size=n)
+    y = np.array([rng.choice(k, p=p) for p in proba])
+    return y, proba
+
+
+@pytest.mark.parametrize("labels", [["Tidak", "Ya"], ["Sehat", "Insomnia", "Sleep Apnea"]])
+def test_brier_and_log_loss_match_sklearn(labels):
+    rng = np.random.default_rng(0)
+    k = len(labels)
+    y, proba = _random_batch(rng, 5_000, k)
+
+    evaluator = StreamingEvaluator(labels)
+    for start in range(0, len(y), 1_000):   # akumulasi per batch = hitung sekaligus
+        evaluator.update(y[start:start + 1_000].astype(float), proba[start:start + 1_000])
+    report = evaluator.report()
+
+    expected = brier_score_loss(y, proba[:, 1]) if k == 2 else brier_score_loss(y, proba, labels=range(k))
+    assert report["brier"] == pytest.approx(expected)
+    assert report["brier_multiclass"] == (k > 2)
+    assert report["log_loss"] == pytest.approx(log_loss(y, proba, labels=range(k)))
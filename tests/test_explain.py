@@ -0,0 +1,47 @@
+"""Atribusi fitur aditif: `expected_value + kontribusi.sum() == decision_function`."""
+
+import numpy as np
+import pytest
+
+import utils.explain
+from utils.explain import HeartLinearExplainer, SleepTreeExplainer, load_heart_reference
+from utils.models import HEART_FEATURES, SLEEP_FEATURES, load_heart_model, load_sleep_model
+from utils.precision import random_frame
+from utils.training import build_estimator
+
+N_ROWS = 5_000
+
+
+@pytest.fixture(autouse=True)
+def small_chunks(monkeypatch):
+    monkeypatch.setattr(utils.explain, "CHUNK_ROWS", 1_000)   # explain() lewat beberapa chunk
+
+
+def test_heart_explainer_is_additive():
+    model = load_heart_model()
+    X = random_frame("heart", N_ROWS, seed=1)[HEART_FEATURES]
+    explainer = HeartLinearExplainer(model, load_heart_reference())
+    contributions = explainer.explain(X)
+    assert contributions.shape == (N_ROWS, len(HEART_FEATURES))
+    np.testing.assert_allclose(
+        explainer.expected_value + contributions.sum(axis=1), model.decision_function(X), atol=1e-10
+    )
+
+
+def _deep_sleep_model():
+    frame = random_frame("sleep", 5_000, seed=2)[SLEEP_FEATURES]
+    return build_estimator("sleep").set_params(
+        classifier__n_estimators=30, classifier__estimator__max_depth=3,
+    ).fit(frame, load_sleep_model().predict(frame))
+
+
+@pytest.mark.parametrize("load", [load_sleep_model, _deep_sleep_model], ids=["shipped", "depth3"])
+def test_sleep_explainer_is_additive(load):
+    model = load()
+    X = random_frame("sleep", N_ROWS, seed=3)[SLEEP_FEATURES]
+    explainer = SleepTreeExplainer(model)
+    contributions = explainer.explain(X)
+    assert contributions.shape == (N_ROWS, len(SLEEP_FEATURES), len(explainer.classes_))
+    np.testing.assert_allclose(
+        explainer.expected_value + contributions.sum(axis=1), model.decision_function(X), atol=1e-10
+    )
@@ -0,0 +1,90 @@
+"""CSV multi-blok dengan tipe kolom yang berubah di tengah file."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import utils.ingest
+from utils.encoders import HEART_LABEL_MAPS
+from utils.ingest import ResultSink, score_file
+from utils.models import HEART_FEATURES, load_heart_model
+from utils.precision import random_frame
+
+N_ROWS = 20_000
+BLOCK_BYTES = 1 << 16   # blok kecil supaya file uji terbagi ke puluhan blok
+
+
+@pytest.fixture(autouse=True)
+def small_blocks(monkeypatch):
+    monkeypatch.setattr(utils.ingest, "CSV_BLOCK_BYTES", BLOCK_BYTES)
+
+
+@pytest.fixture(scope="module")
+def late_csv(tmp_path_factory):
+    """Kode angka di awal file, lalu label / sel buruk jauh setelah blok pertama."""
+    frame = random_frame("heart", N_ROWS, seed=1)
+    lines = frame.to_csv(index=False, float_format="%g").splitlines()
+    bad = {
+        15_000: ("chest_pain_type", "Typical Angina"),    # label setelah kode angka
+        16_000: ("sex", "Alien"),                         # label tidak dikenal
+        18_000: ("cholesterol", "abc"),                   # teks di kolom numerik
+        19_000: ("age", ""),                              # sel kosong
+    }
+    for row, (col, value) in bad.items():
+        cells = lines[row + 1].split(",")
+        cells[HEART_FEATURES.index(col)] = value
+        lines[row + 1] = ",".join(cells)
+    path = tmp_path_factory.mktemp("csv") / "pasien.csv"
+    path.write_text("\n".join(lines) + "\n")
+    assert path.stat().st_size > 10 * BLOCK_BYTES
+    return path, frame
+
+
+def test_late_type_change_is_rejected_per_row(late_csv, tmp_path):
+    path, frame = late_csv
+    out = tmp_path / "hasil.parquet"
+    with ResultSink(out) as sink:
+        n_rows, n_rejected = score_file(load_heart_model(), "heart", path, sink)
+
+    assert (n_rows, n_rejected) == (N_ROWS, 3)
+    result = pd.read_parquet(out)
+    reasons = result["alasan_ditolak"]
+    assert reasons[16_000] == "sex: kode / label tidak dikenal"
+    assert reasons[18_000] == "cholesterol: kosong / bukan angka"
+    assert reasons[19_000] == "age: kosong / bukan angka"
+
+    # Label "Typical Angina" di-encode ke kode 0, sama dengan baris berkode angka
+    assert reasons[15_000] == ""
+    expected = frame.loc[[15_000]].assign(chest_pain_type=0.0)
+    np.testing.assert_allclose(
+        result.loc[15_000, "prob_ada_penyakit"], load_heart_model().predict_proba(expected)[0, 1]
+    )
+
+
+def test_mixed_coded_and_labelled_column(tmp_path):
+    """Paruh pertama file berkode angka, paruh kedua berlabel seperti di form."""
+    frame = random_frame("heart", N_ROWS, seed=2)
+    mixed = frame.astype(object)
+    half = slice(N_ROWS // 2, None)
+    for col, mapping in HEART_LABEL_MAPS.items():
+        labels = {code: label for label, code in mapping.items()}
+        mixed.loc[mixed.index[half], col] = frame[col][half].map(labels)
+    path = tmp_path / "campur.csv"
+    mixed.to_csv(path, index=False)
+    assert path.stat().st_size > 10 * BLOCK_BYTES
+
+    out = tmp_path / "hasil.parquet"
+    with ResultSink(out) as sink:
+        assert score_file(load_heart_model(), "heart", path, sink) == (N_ROWS, 0)
+    np.testing.assert_allclose(
+        pd.read_parquet(out)["prob_ada_penyakit"], load_heart_model().predict_proba(frame)[:, 1]
+    )
+
+
+def test_missing_column_reported(tmp_path):
+    path = tmp_path / "kurang.csv"
+    random_frame("heart", 3, seed=3).drop(columns="thalassemia").to_csv(path, index=False)
+    out = tmp_path / "hasil.parquet"
+    with ResultSink(out) as sink:
+        assert score_file(load_heart_model(), "heart", path, sink) == (3, 3)
+    assert set(pd.read_parquet(out)["alasan_ditolak"]) == {"thalassemia: kolom tidak ada"}
@@ -0,0 +1,32 @@
+"""Model float32 (`utils.precision`) vs model float64 asli."""
+
+import pytest
+
+from utils.models import SLEEP_FEATURES, load_heart_model, load_sleep_model
+from utils.precision import compare_precision, random_frame
+from utils.training import build_estimator
+
+N_ROWS = 100_000
+MAX_DEVIATION = 1e-6   # batas yang dijanjikan di halaman (mode hemat memori)
+
+
+@pytest.mark.parametrize("kind, load", [("heart", load_heart_model), ("sleep", load_sleep_model)])
+def test_shipped_models_within_bound(kind, load):
+    report = compare_precision(load(), kind, random_frame(kind, N_ROWS, seed=7))
+    assert report["max_abs_deviation"] < MAX_DEVIATION
+    # Label hanya boleh berbeda untuk baris yang probabilitasnya nyaris seri
+    assert report["label_agreement"] >= 1 - 1e-4
+
+
+def test_deeper_sleep_trees_within_bound():
+    """Model hasil tuning ulang (`tools/train.py`) bisa memakai pohon kedalaman > 1."""
+    frame = random_frame("sleep", 5_000, seed=8)[SLEEP_FEATURES]
+    y = load_sleep_model().predict(frame)
+    model = build_estimator("sleep").set_params(
+        classifier__n_estimators=30, classifier__estimator__max_depth=3,
+    ).fit(frame, y)
+    assert max(est.tree_.max_depth for est in model[-1].estimators_) > 1
+
+    report = compare_precision(model, "sleep", random_frame("sleep", N_ROWS, seed=9))
+    assert report["max_abs_deviation"] < MAX_DEVIATION
+    assert report["label_agreement"] >= 1 - 1e-4
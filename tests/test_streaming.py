@@ -0,0 +1,64 @@
+"""Melewati scoring saat region split tidak berubah tidak boleh mengubah event."""
+
+import json
+
+import numpy as np
+import pytest
+
+from utils.models import SLEEP_FEATURES, load_sleep_model
+from utils.precision import random_frame
+from utils.streaming import PROFILE_FEATURES, StreamScorer
+from utils.training import build_estimator
+
+N_USERS = 200
+HOURS = 72
+BATCH_LINES = 500
+
+
+def _feed(seed=0):
+    """JSON lines: profil per pengguna, lalu bacaan wearable per jam selama `HOURS` jam."""
+    rng = np.random.default_rng(seed)
+    profiles = random_frame("sleep", N_USERS, seed=seed)
+    lines = []
+    for u, profile in profiles.iterrows():
+        lines.append(json.dumps({"user": f"u{u}", **{f: float(profile[f]) for f in PROFILE_FEATURES}}))
+    start = 1_760_000_000
+    for hour in range(HOURS):
+        for u in rng.permutation(N_USERS):
+            ts = start + hour * 3600 + int(rng.integers(0, 3600))
+            event = {
+                "user": f"u{u}", "ts": ts,
+                "Heart_Rate": int(rng.integers(50, 110)),
+                "Daily_Steps": int(rng.integers(0, 900)),
+                "Physical_Activity": int(rng.integers(0, 5)),
+            }
+            if hour % 24 == 6:
+                event["Sleep_Duration"] = round(float(rng.uniform(4, 9)), 1)
+            lines.append(json.dumps(event))
+    return lines
+
+
+def _deep_sleep_model():
+    frame = random_frame("sleep", 5_000, seed=2)[SLEEP_FEATURES]
+    return build_estimator("sleep").set_params(
+        classifier__n_estimators=30, classifier__estimator__max_depth=3,
+    ).fit(frame, load_sleep_model().predict(frame))
+
+
+@pytest.mark.parametrize("load", [load_sleep_model, _deep_sleep_model], ids=["shipped", "depth3"])
+def test_skipped_scoring_matches_forced_rescoring(load):
+    model = load()
+    lines = _feed()
+    lazy, forced = StreamScorer(model), StreamScorer(model)
+
+    lazy_events, forced_events = [], []
+    for start in range(0, len(lines), BATCH_LINES):
+        batch = lines[start:start + BATCH_LINES]
+        lazy_events += lazy.process(batch)
+        forced.signature[:] = -1   # region "berubah" -> semua pengguna diskor ulang
+        forced_events += forced.process(batch)
+
+    assert lazy.n_skipped > 0 and forced.n_skipped == 0
+    assert lazy.n_scored < forced.n_scored
+    assert lazy_events == forced_events
+    assert len(lazy_events) > N_USERS   # ada perubahan prediksi setelah skor pertama
@@ -0,0 +1,42 @@
+"""Artifact versi training: referensi fitur ikut ditulis & dipromosikan bersama model."""
+
+import json
+
+import numpy as np
+import pytest
+
+import utils.training
+from utils.explain import HeartLinearExplainer, load_heart_reference
+from utils.models import HEART_FEATURES, load_heart_model
+from utils.precision import random_frame
+from utils.training import promote, save_version
+
+
+def test_promote_installs_reference_from_training_data(tmp_path, monkeypatch):
+    model_path = tmp_path / "heart_model.pkl"
+    reference_path = tmp_path / "heart_reference.json"
+    entry = utils.training.TRAINING_DATA["heart"]
+    monkeypatch.setitem(
+        utils.training.TRAINING_DATA, "heart", entry[:3] + (str(model_path), str(reference_path))
+    )
+
+    X = random_frame("heart", 500, seed=4)[HEART_FEATURES].astype(float)
+    y = np.arange(len(X)) % 2
+    source = tmp_path / "heart.parquet"
+    X.assign(target=y).to_parquet(source)
+
+    model = load_heart_model()
+    version_dir = save_version("heart", model, {}, str(source), X, y, 0, versions_dir=str(tmp_path / "versions"))
+    installed = promote("heart", version_dir)
+    assert set(installed) == {str(model_path), str(reference_path)}
+
+    reference = load_heart_reference(str(reference_path))
+    for col in HEART_FEATURES:
+        assert reference[col]["mean"] == pytest.approx(X[col].mean(), abs=1e-6)
+        assert reference[col]["std"] == pytest.approx(X[col].std(), abs=1e-6)
+
+    # z-score pasien serupa kini berpusat pada data training model yang dipakai
+    explainer = HeartLinearExplainer(model, reference)
+    np.testing.assert_allclose(explainer.zscores(X).mean(axis=0), 0, atol=1e-5)
+    with open(f"{version_dir}/metadata.json", encoding="utf-8") as f:
+        assert json.load(f)["features"] == HEART_FEATURES
@@ -0,0 +1,114 @@
+"""Evaluasi offline model terhadap file berlabel (Parquet / Arrow / CSV).
+
+File di-stream per batch lewat jalur scoring yang sama dengan prediksi bulk di
+halaman, jadi hasil evaluasi mencerminkan apa yang dilihat pengguna. Memori
+tetap kecil berapa pun ukuran file (lihat `utils.evaluation`).
+
+Kolom label: `target` (0/1) untuk model jantung, `Sleep_Disorder`
+("None" / "Insomnia" / "Sleep Apnea" atau kode 0/1/2) untuk model tidur.
+
+Contoh:
+    python tools/evaluate.py heart data/outcome_jantung.parquet
+    python tools/evaluate.py sleep data/outcome_tidur.csv --output eval_tidur.json --curves
+"""
+
+import argparse
+import datetime
+import json
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _fmt(value, digits=4):
+    return "-" if value is None else f"{value:.{digits}f}"
+
+
+def print_report(kind, report):
+    print(
+        f"[{kind}] {report['n_evaluated']:,} dari {report['n_rows']:,} baris dievaluasi "
+        f"({report['n_rejected']:,} ditolak skema, {report['n_invalid_label']:,} label tidak valid)"
+    )
+    brier = "Brier multikelas" if report["brier_multiclass"] else "Brier"
+    print(
+        f"  akurasi {_fmt(report['accuracy'])} | log loss {_fmt(report['log_loss'])} | "
+        f"{brier} {_fmt(report['brier'])} | macro F1 {_fmt(report['macro']['f1'])} | "
+        f"macro ROC AUC {_fmt(report['macro']['roc_auc'])}"
+    )
+
+    labels = list(report["per_class"])
+    width = max(len(label) for label in labels)
+    print(f"  {'kelas':<{width}}  support  precision  recall  f1      roc_auc  avg_prec  ece")
+    for label, m in report["per_class"].items():
+        print(
+            f"  {label:<{width}}  {m['support']:>7,}  {_fmt(m['precision']):>9}  {_fmt(m['recall']):>6}  "
+            f"{_fmt(m['f1'])}  {_fmt(m['roc_auc']):>7}  {_fmt(m['average_precision']):>8}  {_fmt(m['ece'])}"
+        )
+
+    print("  confusion matrix (baris = label asli, kolom = prediksi):")
+    for label, row in zip(labels, report["confusion_matrix"]):
+        print(f"    {label:<{width}}  " + "  ".join(f"{v:>9,}" for v in row))
+
+
+# =========================
+# MAIN
+# =========================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("kind", choices=["heart", "sleep"], help="model yang dievaluasi")
+    parser.add_argument("path", help="file berlabel (.parquet, .arrow, .feather, .csv)")
+    parser.add_argument("--precision", choices=["float64", "float32"], default="float64")
+    parser.add_argument("--batch-rows", type=int, default=None, help="jumlah baris per batch")
+    parser.add_argument("--output", help="simpan laporan lengkap sebagai JSON")
+    parser.add_argument("--curves", action="store_true", help="sertakan titik kurva ROC / PR di JSON")
+    args = parser.parse_args(argv)
+
+    # Path relatif terhadap direktori pemanggil, sebelum pindah ke root repo
+    path = os.path.abspath(args.path)
+    output = os.path.abspath(args.output) if args.output else None
+    os.chdir(ROOT)
+    sys.path.insert(0, ROOT)
+
+    from utils.evaluation import evaluate_file
+    from utils.ingest import BATCH_ROWS
+    from utils.models import load_heart_model, load_sleep_model
+
+    model = load_heart_model() if args.kind == "heart" else load_sleep_model()
+    start = time.perf_counter()
+    evaluator = evaluate_file(
+        model, args.kind, path,
+        batch_rows=args.batch_rows or BATCH_ROWS,
+        precision=args.precision,
+        on_batch=lambda n: print(f"\r⏳ {n:,} baris...", end="", file=sys.stderr),
+    )
+    elapsed = time.perf_counter() - start
+    print(file=sys.stderr)
+
+    report = evaluator.report()
+    print_report(args.kind, report)
+    print(f"  {elapsed:.1f} detik ({report['n_rows'] / max(elapsed, 1e-9):,.0f} baris/detik)")
+
+    if output:
+        report = {
+            "timestamp":  datetime.datetime.now().isoformat(timespec="seconds"),
+            "model":      args.kind,
+            "source":     path,
+            "precision":  args.precision,
+            **report,
+        }
+        if args.curves:
+            report["curves"] = {
+                label: {key: values.tolist() for key, values in evaluator.curves(k).items()}
+                for k, label in enumerate(evaluator.class_labels)
+            }
+        with open(output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Laporan disimpan ke {output}")
+
+    return 0 if report["n_evaluated"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
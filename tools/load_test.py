@@ -0,0 +1,251 @@
+"""Load test lokal: simulasi N sesi bersamaan terhadap halaman prediksi.
+
+Setiap sesi membuka halaman lewat `streamlit.testing.v1.AppTest`, mengisi form
+dengan nilai acak yang valid (dalam batas min/max widget), lalu submit berulang
+kali. Semua sesi hidup bersamaan di thread masing-masing, tetapi AppTest tidak
+thread-safe sehingga eksekusi script diserialisasi dengan lock; latensi yang
+dilaporkan sudah termasuk waktu antre, mirip satu proses server yang sibuk.
+
+Hasil (throughput, persentil latensi, RSS proses saat ini, pertumbuhan memori per sesi,
+dan jumlah `joblib.load` per file model) ditambahkan ke file JSONL supaya
+kapasitas bisa dibandingkan antar rilis.
+
+Contoh:
+    python tools/load_test.py --sessions 20 --submits 5
+    python tools/load_test.py --pages sleep --sessions 50 --output hasil.jsonl
+"""
+
+import argparse
+import datetime
+import json
+import logging
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import joblib
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PAGES = {
+    "heart": "pages/heart_disease.py",
+    "sleep": "pages/sleep_quality.py",
+}
+
+DEFAULT_OUTPUT = os.path.join(ROOT, "tools", "load_test_results.jsonl")
+
+# Kalau satu halaman memanggil joblib.load lebih dari ini, model hampir pasti
+# tidak di-cache (setiap rerun memuat salinan model sendiri)
+MAX_EXPECTED_LOADS = 1
+
+# AppTest memakai state global saat eksekusi script, jadi run tidak boleh tumpang tindih
+_RUN_LOCK = threading.Lock()
+
+
+# =========================
+# UTIL
+# =========================
+def rss_mb():
+    """RSS proses saat ini (MB) dari /proc; None di luar Linux.
+
+    Bukan `ru_maxrss`: itu puncak RSS dan tidak pernah turun, jadi selisihnya
+    tidak mengukur memori yang benar-benar masih dipegang sesi.
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / 1024 ** 2
+    except OSError:
+        return None
+
+
+def _round(value, digits):
+    return None if value is None else round(value, digits)
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, text=True, stderr=subprocess.DEVNULL
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class LoadCounter:
+    """Hitung panggilan joblib.load per file model selama load test."""
+
+    def __init__(self):
+        self.counts = {}
+        self._lock = threading.Lock()
+        self._orig = joblib.load
+
+    def __enter__(self):
+        def counting_load(filename, *args, **kwargs):
+            with self._lock:
+                key = os.path.basename(str(filename))
+                self.counts[key] = self.counts.get(key, 0) + 1
+            return self._orig(filename, *args, **kwargs)
+
+        joblib.load = counting_load
+        return self
+
+    def __exit__(self, *exc):
+        joblib.load = self._orig
+
+
+# =========================
+# SESI
+# =========================
+def randomize_form(at, rng):
+    """Isi semua widget form dengan nilai acak dalam batas widget tersebut."""
+    for w in at.number_input:
+        if isinstance(w.value, int):
+            w.set_value(rng.randint(int(w.min), int(w.max)))
+        else:
+            steps = int(round((w.max - w.min) / w.step))
+            w.set_value(round(w.min + rng.randint(0, steps) * w.step, 4))
+    for w in at.slider:
+        w.set_value(rng.randint(int(w.min), int(w.max)))
+    for w in at.selectbox:
+        w.select_index(rng.randrange(len(w.options)))
+
+
+def run_session(page_path, n_submits, seed, timeout):
+    """Return (latensi per submit, jumlah error, AppTest); AppTest ikut dikembalikan
+    supaya session state-nya tetap hidup sampai RSS diukur."""
+    from streamlit.testing.v1 import AppTest
+
+    rng = random.Random(seed)
+    latencies, errors = [], 0
+
+    with _RUN_LOCK:
+        at = AppTest.from_file(page_path, default_timeout=timeout).run()
+    for _ in range(n_submits):
+        start = time.perf_counter()
+        with _RUN_LOCK:
+            randomize_form(at, rng)
+            at.button[0].click()
+            at.run()
+        latencies.append(time.perf_counter() - start)
+        errors += len(at.exception)
+    return latencies, errors, at
+
+
+def run_page(name, n_sessions, n_submits, seed, timeout):
+    page_path = os.path.join(ROOT, PAGES[name])
+
+    # Warm-up satu sesi supaya cache_resource (model, explainer, index) terisi
+    # dan tidak dihitung sebagai pertumbuhan memori per sesi
+    run_session(page_path, 1, seed, timeout)
+    rss_before = rss_mb()
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=n_sessions) as ex:
+        results = list(ex.map(
+            lambda i: run_session(page_path, n_submits, seed + i + 1, timeout),
+            range(n_sessions),
+        ))
+    elapsed = time.perf_counter() - start
+    rss_after = rss_mb()   # `results` masih memegang semua AppTest -> sesi belum di-GC
+
+    latencies = np.concatenate([r[0] for r in results]) * 1000
+    n_requests = len(latencies)
+    return {
+        "page":                     name,
+        "sessions":                 n_sessions,
+        "submits_per_session":      n_submits,
+        "requests":                 n_requests,
+        "errors":                   int(sum(r[1] for r in results)),
+        "elapsed_s":                round(elapsed, 3),
+        "throughput_rps":           round(n_requests / elapsed, 2),
+        "latency_ms": {
+            "p50":  round(float(np.percentile(latencies, 50)), 1),
+            "p90":  round(float(np.percentile(latencies, 90)), 1),
+            "p99":  round(float(np.percentile(latencies, 99)), 1),
+            "max":  round(float(latencies.max()), 1),
+        },
+        "rss_before_mb":            _round(rss_before, 1),
+        "rss_after_mb":             _round(rss_after, 1),
+        "rss_growth_per_session_mb": (
+            None if rss_before is None else round((rss_after - rss_before) / n_sessions, 2)
+        ),
+    }
+
+
+# =========================
+# MAIN
+# =========================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", nargs="+", choices=sorted(PAGES), default=sorted(PAGES))
+    parser.add_argument("--sessions", type=int, default=10, help="jumlah sesi bersamaan")
+    parser.add_argument("--submits", type=int, default=5, help="jumlah submit per sesi")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--timeout", type=float, default=60, help="timeout per rerun (detik)")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="file JSONL hasil (di-append)")
+    args = parser.parse_args(argv)
+
+    # Jalankan seperti `streamlit run app.py`: cwd & sys.path di root repo
+    os.chdir(ROOT)
+    sys.path.insert(0, ROOT)
+    # AppTest berjalan tanpa server (bare mode): "missing ScriptRunContext" dari
+    # thread sesi memang bisa diabaikan. Peringatan lain (InconsistentVersionWarning
+    # sklearn, deprecation Streamlit) tetap tampil. Pakai filter, bukan level,
+    # karena Streamlit menyetel ulang level logger-nya saat membaca config.
+    from streamlit.logger import get_logger
+    get_logger("streamlit.runtime.scriptrunner_utils.script_run_context").addFilter(
+        lambda record: "missing ScriptRunContext" not in record.getMessage()
+    )
+
+    # Riwayat pasien dari load test tidak boleh masuk ke index pasien serupa
+    # maupun agregat analitik yang asli, dan JobRunner load test tidak boleh
+    # mengerjakan antrean job server yang asli
+    import utils.analytics
+    import utils.jobs
+    import utils.neighbors
+    utils.neighbors.NEIGHBORS_DIR = tempfile.mkdtemp(prefix="load_test_neighbors_")
+    utils.analytics.ANALYTICS_DIR = tempfile.mkdtemp(prefix="load_test_analytics_")
+    utils.jobs.JOBS_DIR = tempfile.mkdtemp(prefix="load_test_jobs_")
+
+    with LoadCounter() as loads:
+        pages = [run_page(p, args.sessions, args.submits, args.seed, args.timeout) for p in args.pages]
+
+    report = {
+        "timestamp":    datetime.datetime.now().isoformat(timespec="seconds"),
+        "git_revision": git_revision(),
+        "model_loads":  loads.counts,
+        # Run script diserialisasi `_RUN_LOCK`: latensi = waktu antre + eksekusi
+        # berurutan, bukan eksekusi yang benar-benar paralel
+        "serialized_runs": True,
+        "pages":        pages,
+    }
+
+    with open(args.output, "a", encoding="utf-8") as f:
+        f.write(json.dumps(report) + "\n")
+
+    for p in pages:
+        lat = p["latency_ms"]
+        print(
+            f"[{p['page']}] {p['requests']} submit, {p['errors']} error, "
+            f"{p['throughput_rps']} req/s, p50 {lat['p50']} ms, p99 {lat['p99']} ms, "
+            f"RSS {p['rss_before_mb']} -> {p['rss_after_mb']} MB "
+            f"({p['rss_growth_per_session_mb']} MB/sesi)"
+        )
+    print("Catatan: run script diserialisasi (AppTest tidak thread-safe); latensi termasuk waktu antre, bukan eksekusi paralel.")
+    for filename, n in loads.counts.items():
+        if n > MAX_EXPECTED_LOADS:
+            print(f"⚠️  {filename} dimuat {n}x — model kemungkinan tidak di-cache per proses")
+    print(f"Hasil disimpan ke {args.output}")
+
+    return 1 if any(p["errors"] for p in pages) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
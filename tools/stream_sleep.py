@@ -0,0 +1,96 @@
+"""Pantau feed wearable per pengguna dan laporkan perubahan prediksi gangguan tidur.
+
+Input berupa JSON lines (satu event per baris, format di `utils.streaming`)
+dari file, named pipe, stdin (`-`), atau socket TCP (`tcp://host:port`, tool
+ini yang menyambung ke pengirim). Setiap kali kelas prediksi seorang pengguna
+berubah, satu baris JSON ditulis ke stdout atau `--output` (append).
+
+Contoh:
+    python tools/stream_sleep.py data/feed.jsonl
+    tail -F /var/log/wearable.jsonl | python tools/stream_sleep.py - --output perubahan.jsonl
+    python tools/stream_sleep.py tcp://127.0.0.1:9000 --window-hours 48
+"""
+
+import argparse
+import json
+import os
+import socket
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def open_source(spec):
+    """Return (file descriptor, fungsi penutup) untuk `-`, `tcp://host:port`, atau path."""
+    if spec == "-":
+        return sys.stdin.fileno(), lambda: None
+    if spec.startswith("tcp://"):
+        host, port = spec[len("tcp://"):].rsplit(":", 1)
+        sock = socket.create_connection((host, int(port)))
+        return sock.fileno(), sock.close
+    fd = os.open(spec, os.O_RDONLY)
+    return fd, lambda: os.close(fd)
+
+
+def print_stats(stats, elapsed):
+    print(
+        f"{stats['n_events']:,} event ({stats['n_events'] / max(elapsed, 1e-9):,.0f}/detik) · "
+        f"{stats['n_users']:,} pengguna · {stats['n_scored']:,} diskor ulang, "
+        f"{stats['n_skipped']:,} dilewati · {stats['n_changes']:,} perubahan · "
+        f"{stats['n_invalid']:,} tidak valid, {stats['n_late']:,} terlambat · "
+        f"state {stats['state_bytes'] / 2**20:.1f} MB",
+        file=sys.stderr,
+    )
+
+
+# =========================
+# MAIN
+# =========================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("source", help="file / named pipe, '-' untuk stdin, atau tcp://host:port")
+    parser.add_argument("--output", help="tulis event perubahan ke file JSONL (append)")
+    parser.add_argument("--window-hours", type=float, default=24, help="panjang sliding window")
+    parser.add_argument("--bucket-minutes", type=float, default=60, help="resolusi window")
+    parser.add_argument("--stats-every", type=float, default=30, help="interval ringkasan ke stderr (detik)")
+    args = parser.parse_args(argv)
+
+    # Path relatif terhadap direktori pemanggil, sebelum pindah ke root repo
+    source = args.source if args.source == "-" or "://" in args.source else os.path.abspath(args.source)
+    output = os.path.abspath(args.output) if args.output else None
+    os.chdir(ROOT)
+    sys.path.insert(0, ROOT)
+
+    from utils.models import load_sleep_model
+    from utils.streaming import StreamScorer, iter_line_batches
+
+    scorer = StreamScorer(
+        load_sleep_model(),
+        window_seconds=int(args.window_hours * 3600),
+        bucket_seconds=int(args.bucket_minutes * 60),
+    )
+    out = open(output, "a", encoding="utf-8") if output else sys.stdout
+    fd, close = open_source(source)
+    start = last_stats = time.perf_counter()
+    try:
+        for lines in iter_line_batches(fd):
+            for event in scorer.process(lines):
+                out.write(json.dumps(event) + "\n")
+            out.flush()
+            now = time.perf_counter()
+            if now - last_stats >= args.stats_every:
+                print_stats(scorer.stats(), now - start)
+                last_stats = now
+    except KeyboardInterrupt:
+        pass
+    finally:
+        close()
+        if output:
+            out.close()
+    print_stats(scorer.stats(), time.perf_counter() - start)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
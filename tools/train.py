@@ -0,0 +1,83 @@
+"""Training ulang model dari dataset lokal berlabel (Parquet / Arrow / CSV).
+
+Grid search hyperparameter dengan stratified K-fold berjalan paralel di semua
+core; hasilnya disimpan sebagai folder versi berisi `model.pkl` dan
+`metadata.json` (lihat `utils.training`). Model yang dipakai aplikasi baru
+diganti jika `--promote` diberikan; restart server Streamlit setelahnya karena
+model di-cache per proses.
+
+Format dataset sama dengan `tools/evaluate.py`: kolom fitur model (kode angka
+atau label seperti di form) + kolom label `target` (jantung) atau
+`Sleep_Disorder` (tidur).
+
+Contoh:
+    python tools/train.py heart data/heart.csv
+    python tools/train.py sleep data/sleep.parquet --folds 10 --promote
+"""
+
+import argparse
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def print_summary(kind, summary, top=5):
+    print(
+        f"[{kind}] {summary['n_candidates']} kandidat x {summary['cv_folds']} fold "
+        f"dalam {summary['search_seconds']:.1f} detik — skor CV terbaik "
+        f"({summary['scoring']}): {summary['best_score']:.4f}"
+    )
+    print(f"  {'rank':>4}  {'mean':>7}  {'std':>7}  parameter")
+    for c in summary["candidates"][:top]:
+        params = ", ".join(f"{k.split('__', 1)[-1]}={v}" for k, v in c["params"].items())
+        print(f"  {c['rank']:>4}  {c['mean']:.4f}  {c['std']:.4f}  {params}")
+
+
+# =========================
+# MAIN
+# =========================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("kind", choices=["heart", "sleep"], help="model yang dilatih")
+    parser.add_argument("path", help="dataset berlabel (.parquet, .arrow, .feather, .csv)")
+    parser.add_argument("--folds", type=int, default=None, help="jumlah fold CV (default 5)")
+    parser.add_argument("--seed", type=int, default=None, help="seed fold & model (default 42)")
+    parser.add_argument("--jobs", type=int, default=-1, help="jumlah proses paralel (-1 = semua core)")
+    parser.add_argument("--promote", action="store_true", help="pakai model baru di aplikasi")
+    args = parser.parse_args(argv)
+
+    # Path relatif terhadap direktori pemanggil, sebelum pindah ke root repo
+    path = os.path.abspath(args.path)
+    os.chdir(ROOT)
+    sys.path.insert(0, ROOT)
+
+    from utils.training import CV_FOLDS, SEED, load_dataset, promote, save_version, train
+
+    start = time.perf_counter()
+    X, y, n_dropped = load_dataset(args.kind, path)
+    print(f"[{args.kind}] {len(X):,} baris dipakai, {n_dropped:,} dibuang (skema / label tidak valid)")
+    if not len(X):
+        return 1
+
+    model, summary = train(
+        args.kind, X, y,
+        folds=args.folds or CV_FOLDS,
+        seed=SEED if args.seed is None else args.seed,
+        n_jobs=args.jobs,
+    )
+    print_summary(args.kind, summary)
+
+    version_dir = save_version(args.kind, model, summary, path, X, y, n_dropped)
+    print(f"  artifact: {version_dir} ({time.perf_counter() - start:.1f} detik total)")
+    if args.promote:
+        print(f"  dipromosikan ke {', '.join(promote(args.kind, version_dir))}")
+        if args.kind == "heart":
+            print("  catatan: riwayat pasien serupa (data/neighbors/heart) tersimpan dalam z-score "
+                  "referensi lama; hapus folder itu agar jarak dihitung dengan referensi baru")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1 @@
+"""Helper bersama untuk halaman-halaman di folder `pages/` (model, atribusi, dsb)."""
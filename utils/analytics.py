@@ -0,0 +1,177 @@
+"""Agregat berjalan (running aggregates) untuk analitik kohort hasil prediksi.
+
+Setiap prediksi menambah counter di bucket harian: jumlah per kelas, jumlah
+probabilitas per kelas, frekuensi faktor risiko, dan distribusi keparahan.
+Halaman analitik hanya membaca counter ini, jadi waktu render bergantung pada
+jumlah hari, bukan jumlah prediksi yang sudah terkumpul.
+
+Prediksi form dicatat satu per satu (`record`); prediksi bulk & job dicatat
+sekali per batch dari ringkasan `utils.scoring.cohort_summary` (`add_summary`),
+tanpa faktor risiko karena flag hanya dihitung di form. Job diringkas di worker
+lalu dicatat oleh scheduler di proses server, jadi tetap hanya satu penulis.
+
+Counter ditulis ke disk paling sering sekali per `SAVE_SECONDS` (dan saat proses
+berhenti), bukan per prediksi.
+"""
+
+import atexit
+import datetime
+import json
+import os
+import threading
+
+import pandas as pd
+
+from utils.encoders import CLASS_LABELS
+
+# =========================
+# KONSTANTA
+# =========================
+ANALYTICS_DIR = "data/analytics"
+SAVE_SECONDS = 5.0   # jeda maksimal antara prediksi dan tulis ke disk
+
+
+class CohortStats:
+    """Counter per hari untuk satu model, disimpan sebagai JSON kecil di disk."""
+
+    def __init__(self, path, class_labels):
+        self.path = path
+        self.class_labels = class_labels
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()   # satu penulis file pada satu waktu
+        self._timer = None                   # flush terjadwal (None = tidak ada perubahan)
+        self.days = {}
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                self.days = json.load(f)["days"]
+
+    def _bucket(self, day):
+        n_classes = len(self.class_labels)
+        return self.days.setdefault(day, {
+            "n":         0,
+            "n_form":    0,   # prediksi dari form (penyebut frekuensi faktor risiko)
+            "classes":   [0] * n_classes,
+            "prob_sum":  [0.0] * n_classes,
+            "flags":     {},
+            "severity":  {},
+        })
+
+    def record(self, pred, probabilities, flags=(), severity=None, when=None):
+        """Tambahkan satu prediksi ke agregat (O(jumlah flag), bukan O(riwayat))."""
+        day = (when or datetime.date.today()).isoformat()
+        with self._lock:
+            b = self._bucket(day)
+            b["n"] += 1
+            b["n_form"] = b.get("n_form", 0) + 1
+            b["classes"][int(pred)] += 1
+            for k, p in enumerate(probabilities):
+                b["prob_sum"][k] += float(p)
+            for name in flags:
+                b["flags"][name] = b["flags"].get(name, 0) + 1
+            if severity is not None:
+                b["severity"][severity] = b["severity"].get(severity, 0) + 1
+            self._schedule_flush()
+
+    def add_summary(self, summary, when=None):
+        """Tambahkan ringkasan satu batch bulk (n, jumlah per kelas, jumlah prob., keparahan)."""
+        if not summary["n"]:
+            return
+        day = (when or datetime.date.today()).isoformat()
+        with self._lock:
+            b = self._bucket(day)
+            b["n"] += summary["n"]
+            for k, (c, p) in enumerate(zip(summary["classes"], summary["prob_sum"])):
+                b["classes"][k] += c
+                b["prob_sum"][k] += p
+            for name, c in summary["severity"].items():
+                b["severity"][name] = b["severity"].get(name, 0) + c
+            self._schedule_flush()
+
+    def _schedule_flush(self):
+        if self._timer is None:
+            self._timer = threading.Timer(SAVE_SECONDS, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def flush(self):
+        """Tulis counter ke disk jika ada perubahan (atomik: file sementara + os.replace)."""
+        with self._save_lock:
+            with self._lock:
+                if self._timer is None:
+                    return
+                self._timer.cancel()
+                self._timer = None
+                payload = json.dumps({"classes": self.class_labels, "days": self.days})
+            tmp = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write(payload)
+            os.replace(tmp, self.path)
+
+    # =========================
+    # RINGKASAN (untuk halaman analitik)
+    # =========================
+    def daily(self):
+        """DataFrame per hari: jumlah per kelas + rata-rata probabilitas per kelas."""
+        with self._lock:
+            days = sorted(self.days.items())
+        rows = []
+        for day, b in days:
+            row = {"Tanggal": pd.Timestamp(day), "Jumlah": b["n"]}
+            for k, label in enumerate(self.class_labels):
+                row[label] = b["classes"][k]
+                row[f"Prob. {label}"] = b["prob_sum"][k] / b["n"] if b["n"] else 0.0
+            rows.append(row)
+        return pd.DataFrame(rows)
+
+    def daily_counts(self, field):
+        """DataFrame per hari untuk counter bernama (`"flags"` / `"severity"`):
+        kolom `Tanggal`, `Jumlah` (semua prediksi hari itu), `Jumlah Form`, lalu satu
+        kolom per nama (0 jika tidak ada)."""
+        with self._lock:
+            days = sorted((day, b["n"], b.get("n_form", b["n"]), dict(b[field])) for day, b in self.days.items())
+        frame = pd.DataFrame([counts for *_, counts in days]).fillna(0).astype(int)
+        frame.insert(0, "Jumlah Form", [n_form for _, _, n_form, _ in days])
+        frame.insert(0, "Jumlah", [n for _, n, _, _ in days])
+        frame.insert(0, "Tanggal", [pd.Timestamp(day) for day, *_ in days])
+        return frame
+
+    def totals(self):
+        """Total keseluruhan: n (dan n dari form), jumlah per kelas, rata-rata probabilitas,
+        flag, keparahan."""
+        n_classes = len(self.class_labels)
+        n, classes, prob_sum, flags, severity = 0, [0] * n_classes, [0.0] * n_classes, {}, {}
+        n_form = 0
+        with self._lock:
+            for b in self.days.values():
+                n += b["n"]
+                n_form += b.get("n_form", b["n"])   # bucket lama: semua dari form
+                for k in range(n_classes):
+                    classes[k] += b["classes"][k]
+                    prob_sum[k] += b["prob_sum"][k]
+                for name, c in b["flags"].items():
+                    flags[name] = flags.get(name, 0) + c
+                for name, c in b["severity"].items():
+                    severity[name] = severity.get(name, 0) + c
+        return {
+            "n":          n,
+            "n_form":     n_form,
+            "classes":    classes,
+            "prob_mean":  [s / n if n else 0.0 for s in prob_sum],
+            "flags":      flags,
+            "severity":   severity,
+        }
+
+
+# Satu instance per model per proses, dibagi oleh semua halaman & sesi
+_STORES = {}
+_STORES_LOCK = threading.Lock()
+
+
+def cohort_stats(kind):
+    with _STORES_LOCK:
+        if kind not in _STORES:
+            os.makedirs(ANALYTICS_DIR, exist_ok=True)
+            path = os.path.join(ANALYTICS_DIR, f"{kind}.json")
+            _STORES[kind] = CohortStats(path, CLASS_LABELS[kind])
+            atexit.register(_STORES[kind].flush)
+        return _STORES[kind]
@@ -0,0 +1,125 @@
+"""Figure Plotly ringan: layout dibangun sekali per proses, spec di-cache per hasil.
+
+`go.Figure(...)` + `update_layout` memvalidasi setiap properti dan memakan waktu
+puluhan milidetik per submit. Di sini layout (termasuk template `plotly_white`)
+divalidasi sekali saat modul di-import, lalu setiap figure hanya mengisi data
+trace ke dalam dict. `st.plotly_chart` memanggil `to_dict()` untuk objek Figure
+tanpa validasi ulang, sehingga `SpecFigure` cukup mengembalikan spec yang sudah
+jadi. Spec disimpan per kunci hasil, jadi hasil yang sama tidak dibangun ulang.
+"""
+
+import collections
+import threading
+
+import plotly.graph_objects as go
+
+# =========================
+# KONSTANTA
+# =========================
+CACHE_SIZE = 1024   # jumlah spec figure yang disimpan (LRU)
+
+POSITIVE_COLOR = "#e74c3c"   # mendorong ke arah risiko / kelas
+NEGATIVE_COLOR = "#27ae60"
+
+# Garis vertikal di x=0 (sama dengan fig.add_vline(x=0, line_dash="dash", ...))
+_ZERO_LINE = {
+    "type": "line", "x0": 0, "x1": 0, "xref": "x", "y0": 0, "y1": 1, "yref": "y domain",
+    "line": {"dash": "dash", "color": "gray", "width": 1},
+}
+
+
+def _layout(**kwargs):
+    """Layout tervalidasi (template sudah di-resolve) sebagai dict siap pakai."""
+    return go.Layout(template="plotly_white", **kwargs).to_plotly_json()
+
+
+# Dibangun sekali per proses
+CONTRIBUTION_LAYOUT = _layout(yaxis_title="Fitur", shapes=[_ZERO_LINE])
+PROBABILITY_LAYOUT = _layout(
+    title="Distribusi Probabilitas per Kelas",
+    yaxis_title="Probabilitas (%)",
+    yaxis=dict(range=[0, 110]),
+    xaxis_title="Kategori",
+    height=350,
+    margin=dict(l=40, r=40, t=60, b=40),
+)
+
+
+class SpecFigure(go.Figure):
+    """Figure yang membawa spec dict jadi; `to_dict()` tidak menyalin/memvalidasi ulang."""
+
+    def __init__(self, spec):
+        super().__init__()
+        self._spec = spec
+
+    def to_dict(self):
+        return self._spec
+
+
+# =========================
+# CACHE
+# =========================
+_cache = collections.OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def _cached(key, build):
+    with _cache_lock:
+        if key in _cache:
+            _cache.move_to_end(key)
+            return _cache[key]
+    fig = SpecFigure(build())
+    with _cache_lock:
+        _cache[key] = fig
+        if len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+    return fig
+
+
+# =========================
+# FIGURE
+# =========================
+def contribution_bar(key, labels, values, title, xaxis_title, height, margin_left):
+    """Bar horizontal kontribusi fitur, diurutkan dari terkecil ke terbesar."""
+    def build():
+        order = sorted(range(len(values)), key=lambda i: values[i])
+        vals = [float(values[i]) for i in order]
+        return {
+            "data": [{
+                "type":          "bar",
+                "orientation":   "h",
+                "x":             vals,
+                "y":             [labels[i] for i in order],
+                "marker":        {"color": [POSITIVE_COLOR if v > 0 else NEGATIVE_COLOR for v in vals]},
+                "text":          [f"{v:.3f}" for v in vals],
+                "textposition":  "outside",
+            }],
+            "layout": {
+                **CONTRIBUTION_LAYOUT,
+                "title":   {"text": title},
+                "xaxis":   {"title": {"text": xaxis_title}},
+                "height":  height,
+                "margin":  {"l": margin_left, "r": 60, "t": 60, "b": 40},
+            },
+        }
+
+    return _cached(("contribution", key), build)
+
+
+def probability_bar(key, classes, values, colors):
+    """Bar vertikal probabilitas (%) per kelas."""
+    def build():
+        return {
+            "data": [{
+                "type":          "bar",
+                "x":             list(classes),
+                "y":             [float(v) for v in values],
+                "marker":        {"color": list(colors)},
+                "text":          [f"{v:.2f}%" for v in values],
+                "textposition":  "outside",
+                "width":         0.45,
+            }],
+            "layout": PROBABILITY_LAYOUT,
+        }
+
+    return _cached(("probability", key), build)
@@ -0,0 +1,146 @@
+"""Mapping label tampilan -> kode model, dan encoder vektor untuk file berlabel.
+
+Mapping di sini dipakai langsung oleh selectbox di halaman `pages/` dan juga
+dikompilasi menjadi `CategoryEncoder` untuk jalur bulk, jadi UI dan file bulk
+selalu memakai kode yang sama.
+"""
+
+import numpy as np
+import pandas as pd
+
+# =========================
+# MAPPING
+# =========================
+YES_NO_MAP = {
+    "Tidak": 0,
+    "Ya": 1
+}
+
+HEART_LABEL_MAPS = {
+    "sex": {
+        "Perempuan": 0,
+        "Laki-laki": 1
+    },
+    "chest_pain_type": {
+        "Typical Angina": 0,
+        "Atypical Angina": 1,
+        "Non-anginal Pain": 2,
+        "Asymptomatic": 3
+    },
+    "fasting_blood_sugar": YES_NO_MAP,
+    "resting_electrocardiogram": {
+        "Normal": 0,
+        "ST-T Abnormality": 1,
+        "Left Ventricular Hypertrophy": 2
+    },
+    "exercise_induced_angina": YES_NO_MAP,
+    "st_slope": {
+        "Upsloping": 0,
+        "Flat": 1,
+        "Downsloping": 2
+    },
+    "thalassemia": {
+        "Fixed Defect": 1,
+        "Normal": 2,
+        "Reversible Defect": 3
+    },
+}
+
+SLEEP_LABEL_MAPS = {
+    "Gender": {
+        "Perempuan": 0,
+        "Laki-laki": 1
+    },
+}
+
+# Kolom & label outcome pada file berlabel (evaluasi offline / training)
+TARGET_COLUMNS = {
+    "heart": "target",
+    "sleep": "Sleep_Disorder",
+}
+
+TARGET_LABEL_MAPS = {
+    "heart": {
+        "Tidak Ada Penyakit Jantung": 0,
+        "Ada Penyakit Jantung": 1,
+        "Tidak": 0,
+        "Ya": 1
+    },
+    "sleep": {
+        "Sehat": 0,
+        "None": 0,          # penulisan di dataset Sleep Health & Lifestyle
+        "Insomnia": 1,
+        "Sleep Apnea": 2
+    },
+}
+
+# Nama kelas per kode prediksi model (indeks list = kode)
+CLASS_LABELS = {
+    "heart": ["Tidak Ada Penyakit Jantung", "Ada Penyakit Jantung"],
+    "sleep": ["Sehat", "Insomnia", "Sleep Apnea"],
+}
+
+# Kode untuk label yang tidak dikenal; ditolak validasi sebagai "kode / label tidak dikenal"
+UNKNOWN_CODE = -1
+
+
+# =========================
+# ENCODER
+# =========================
+def _normalize(label):
+    return str(label).strip().casefold()
+
+
+class CategoryEncoder:
+    """Encode satu kolom label (atau kode) ke kode numerik dalam satu pass.
+
+    Nilai unik di-factorize dulu (hash, tanpa loop Python per baris), lalu hanya
+    nilai unik yang dicocokkan ke mapping (tidak peka huruf besar/kecil & spasi).
+    Kode numerik yang sudah benar ("1", 2.0) dibiarkan; label tak dikenal menjadi
+    `UNKNOWN_CODE`, dan nilai kosong menjadi NaN.
+    """
+
+    def __init__(self, mapping):
+        self.mapping = {_normalize(k): v for k, v in mapping.items()}
+
+    def _lookup(self, value):
+        key = _normalize(value)
+        if key in self.mapping:
+            return self.mapping[key]
+        try:
+            return float(key)
+        except ValueError:
+            return UNKNOWN_CODE
+
+    def transform(self, values):
+        codes, uniques = pd.factorize(values, use_na_sentinel=True)
+        # Entry terakhir untuk sentinel -1 (nilai kosong)
+        table = np.array([self._lookup(u) for u in uniques] + [np.nan], dtype=float)
+        return table[codes]
+
+
+HEART_ENCODERS = {col: CategoryEncoder(m) for col, m in HEART_LABEL_MAPS.items()}
+SLEEP_ENCODERS = {col: CategoryEncoder(m) for col, m in SLEEP_LABEL_MAPS.items()}
+TARGET_ENCODERS = {kind: CategoryEncoder(m) for kind, m in TARGET_LABEL_MAPS.items()}
+
+
+def encode_frame(frame, encoders, numeric=()):
+    """Kembalikan `frame` dengan kolom berlabel (non-numerik) sudah di-encode.
+
+    Kolom di `numeric` yang masih berupa teks (mis. CSV yang dibaca sebagai
+    string) dikonversi per sel; nilai yang bukan angka menjadi NaN dan ditolak
+    validasi. Kolom numerik tidak disentuh; frame asli tidak diubah (salinan dangkal).
+    """
+    text = [
+        col for col in dict.fromkeys([*encoders, *numeric])
+        if col in frame.columns and not pd.api.types.is_numeric_dtype(frame[col])
+    ]
+    if not text:
+        return frame
+    frame = frame.copy(deep=False)
+    for col in text:
+        if col in encoders:
+            frame[col] = encoders[col].transform(frame[col])
+        else:
+            frame[col] = pd.to_numeric(frame[col], errors="coerce").astype(float)
+    return frame
@@ -0,0 +1,212 @@
+"""Evaluasi offline satu pass untuk file berlabel, dengan memori terbatas.
+
+File dibaca per batch lewat `utils.ingest` dan diskor dengan scorer yang sama
+seperti prediksi bulk di halaman (encode label, validasi skema, predict). Setiap
+batch hanya menambah counter berukuran tetap:
+
+- confusion matrix (K x K),
+- histogram skor per kelas untuk baris positif & negatif (one-vs-rest, `SCORE_BINS`
+  bin tetap) -> titik kurva ROC / PR dan AUC,
+- bin kalibrasi per kelas (jumlah baris, jumlah probabilitas, jumlah positif),
+- jumlah log loss & Brier score (biner: probabilitas kelas positif; multikelas:
+  jumlah kuadrat selisih atas semua kelas, sama dengan `brier_score_loss` sklearn).
+
+Memori tidak bergantung pada jumlah baris, jadi file yang jauh lebih besar dari
+RAM tetap selesai dalam satu pass. Skor yang jatuh di bin yang sama diperlakukan
+seri, sehingga AUC berbeda < 1 / `SCORE_BINS` dari perhitungan eksak.
+"""
+
+import numpy as np
+
+from utils.encoders import CLASS_LABELS, TARGET_COLUMNS, TARGET_ENCODERS
+from utils.ingest import BATCH_ROWS, iter_batches
+from utils.precision import to_precision
+from utils.scoring import PROBA_COLUMNS, SCORERS
+
+# =========================
+# KONSTANTA
+# =========================
+SCORE_BINS = 1000        # resolusi histogram skor untuk kurva ROC / PR
+CALIBRATION_BINS = 10    # bin reliabilitas (0-0.1, 0.1-0.2, ...)
+
+_EPS = 1e-15             # batas bawah probabilitas untuk log loss (sama dengan sklearn)
+
+
+def _bin_index(proba, n_bins):
+    return np.minimum((proba * n_bins).astype(np.intp), n_bins - 1)
+
+
+class StreamingEvaluator:
+    """Akumulator metrik klasifikasi K kelas; `update()` per batch, `report()` di akhir."""
+
+    def __init__(self, class_labels, score_bins=SCORE_BINS, calibration_bins=CALIBRATION_BINS):
+        self.class_labels = list(class_labels)
+        self.score_bins = score_bins
+        self.calibration_bins = calibration_bins
+        k = len(self.class_labels)
+
+        self.n_rows = 0
+        self.n_rejected = 0          # ditolak validasi skema
+        self.n_invalid_label = 0     # label kosong / tidak dikenal
+        self.confusion = np.zeros((k, k), dtype=np.int64)
+        self.pos_hist = np.zeros((k, score_bins), dtype=np.int64)
+        self.neg_hist = np.zeros((k, score_bins), dtype=np.int64)
+        self.cal_count = np.zeros((k, calibration_bins), dtype=np.int64)
+        self.cal_prob = np.zeros((k, calibration_bins))
+        self.cal_pos = np.zeros((k, calibration_bins), dtype=np.int64)
+        self.log_loss_sum = 0.0
+        self.brier_sum = 0.0
+
+    def update(self, y, proba, rejected=None):
+        """Tambahkan satu batch: `y` kode kelas (float, NaN/-1 = tidak valid), `proba` (n, K)."""
+        k = len(self.class_labels)
+        y = np.asarray(y, dtype=float)
+        proba = np.asarray(proba, dtype=float)
+        self.n_rows += len(y)
+
+        ok = np.ones(len(y), dtype=bool) if rejected is None else ~np.asarray(rejected, dtype=bool)
+        self.n_rejected += int((~ok).sum())
+        valid_label = np.isin(y, np.arange(k))
+        self.n_invalid_label += int((ok & ~valid_label).sum())
+        ok &= valid_label
+        if not ok.any():
+            return
+
+        y = y[ok].astype(np.intp)
+        proba = proba[ok]
+        n = len(y)
+        pred = proba.argmax(axis=1)
+        self.confusion += np.bincount(y * k + pred, minlength=k * k).reshape(k, k)
+
+        # One-vs-rest per kelas; indeks gabungan (kelas, bin) supaya cukup satu bincount
+        is_pos = y[:, None] == np.arange(k)
+        offset = np.arange(k) * self.score_bins
+        score_idx = (_bin_index(proba, self.score_bins) + offset).ravel()
+        pos = is_pos.ravel()
+        self.pos_hist += np.bincount(score_idx[pos], minlength=k * self.score_bins).reshape(k, -1)
+        self.neg_hist += np.bincount(score_idx[~pos], minlength=k * self.score_bins).reshape(k, -1)
+
+        cal_idx = (_bin_index(proba, self.calibration_bins) + np.arange(k) * self.calibration_bins).ravel()
+        size = k * self.calibration_bins
+        self.cal_count += np.bincount(cal_idx, minlength=size).reshape(k, -1)
+        self.cal_prob += np.bincount(cal_idx, weights=proba.ravel(), minlength=size).reshape(k, -1)
+        self.cal_pos += np.bincount(cal_idx[pos], minlength=size).reshape(k, -1)
+
+        p_true = proba[np.arange(n), y]
+        self.log_loss_sum += float(-np.log(np.clip(p_true, _EPS, 1)).sum())
+        if k == 2:
+            self.brier_sum += float(((proba[:, 1] - is_pos[:, 1]) ** 2).sum())
+        else:
+            self.brier_sum += float(((proba - is_pos) ** 2).sum())
+
+    # =========================
+    # KURVA & METRIK
+    # =========================
+    def curves(self, k):
+        """Titik kurva ROC & PR kelas `k` (one-vs-rest), dari threshold tertinggi ke terendah."""
+        tp = np.cumsum(self.pos_hist[k, ::-1])
+        fp = np.cumsum(self.neg_hist[k, ::-1])
+        n_pos, n_neg = tp[-1], fp[-1]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            tpr = tp / n_pos
+            fpr = fp / n_neg
+            precision = np.where(tp + fp > 0, tp / (tp + fp), 1.0)
+        return {
+            "threshold":  np.arange(self.score_bins - 1, -1, -1) / self.score_bins,
+            "fpr":        fpr,
+            "tpr":        tpr,
+            "precision":  precision,
+            "recall":     tpr,
+        }
+
+    def _class_metrics(self, k):
+        c = self.curves(k)
+        n_pos = int(self.pos_hist[k].sum())
+        n_neg = int(self.neg_hist[k].sum())
+        tp = int(self.confusion[k, k])
+        predicted = int(self.confusion[:, k].sum())
+
+        precision = tp / predicted if predicted else 0.0
+        recall = tp / n_pos if n_pos else 0.0
+        f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+
+        roc_auc = average_precision = None
+        if n_pos and n_neg:
+            # Trapesium dari titik (0, 0); skor dalam satu bin dihitung seri
+            tpr, fpr = np.r_[0, c["tpr"]], np.r_[0, c["fpr"]]
+            roc_auc = float((np.diff(fpr) * (tpr[1:] + tpr[:-1]) / 2).sum())
+            average_precision = float((np.diff(np.r_[0, c["recall"]]) * c["precision"]).sum())
+
+        count = self.cal_count[k]
+        seen = count > 0
+        mean_prob = np.divide(self.cal_prob[k], count, out=np.zeros(len(count)), where=seen)
+        frac_pos = np.divide(self.cal_pos[k], count, out=np.zeros(len(count)), where=seen)
+        total = count.sum()
+        ece = float((count * np.abs(mean_prob - frac_pos)).sum() / total) if total else None
+        edges = np.linspace(0, 1, self.calibration_bins + 1)
+
+        return {
+            "support":            n_pos,
+            "precision":          precision,
+            "recall":             recall,
+            "f1":                 f1,
+            "roc_auc":            roc_auc,
+            "average_precision":  average_precision,
+            "ece":                ece,
+            "calibration": [
+                {
+                    "bin":        f"{edges[b]:.1f}-{edges[b + 1]:.1f}",
+                    "n":          int(count[b]),
+                    "mean_prob":  float(mean_prob[b]),
+                    "frac_pos":   float(frac_pos[b]),
+                }
+                for b in range(self.calibration_bins) if seen[b]
+            ],
+        }
+
+    def report(self):
+        n = int(self.confusion.sum())
+        per_class = {label: self._class_metrics(k) for k, label in enumerate(self.class_labels)}
+
+        def macro(key):
+            values = [m[key] for m in per_class.values() if m[key] is not None]
+            return float(np.mean(values)) if values else None
+
+        return {
+            "n_rows":             self.n_rows,
+            "n_evaluated":        n,
+            "n_rejected":         self.n_rejected,
+            "n_invalid_label":    self.n_invalid_label,
+            "accuracy":           float(np.trace(self.confusion) / n) if n else None,
+            "log_loss":           self.log_loss_sum / n if n else None,
+            "brier":              self.brier_sum / n if n else None,
+            "brier_multiclass":   len(self.class_labels) > 2,   # jumlah atas semua kelas, rentang 0-2
+            "macro": {key: macro(key) for key in ("precision", "recall", "f1", "roc_auc", "average_precision")},
+            "confusion_matrix":   self.confusion.tolist(),
+            "per_class":          per_class,
+        }
+
+
+# =========================
+# PIPELINE
+# =========================
+def evaluate_file(model, kind, source, batch_rows=BATCH_ROWS, precision="float64", on_batch=None):
+    """Skor file berlabel per batch dan kembalikan `StreamingEvaluator` yang sudah terisi."""
+    scorer, columns = SCORERS[kind]
+    target = TARGET_COLUMNS[kind]
+    encoder = TARGET_ENCODERS[kind]
+    model = to_precision(model, kind, precision)
+    evaluator = StreamingEvaluator(CLASS_LABELS[kind])
+
+    for frame in iter_batches(source, columns + [target], batch_rows):
+        if target not in frame.columns:
+            raise ValueError(f"Kolom label '{target}' tidak ada di file")
+        result = scorer(model, frame, row_offset=evaluator.n_rows)
+        evaluator.update(
+            encoder.transform(frame[target]),
+            result[PROBA_COLUMNS[kind]].to_numpy(dtype=float),
+            rejected=result["prediksi"].isna().to_numpy(),
+        )
+        if on_batch is not None:
+            on_batch(evaluator.n_rows)
+    return evaluator
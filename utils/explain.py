@@ -0,0 +1,164 @@
+"""Atribusi fitur per-instance untuk model yang dipakai di halaman `pages/`."""
+
+import json
+
+import numpy as np
+
+# =========================
+# KONSTANTA
+# =========================
+# Jumlah baris yang diproses sekaligus saat explain() dipanggil untuk file besar.
+# Membatasi memori array sementara (baris x pohon x kelas).
+CHUNK_ROWS = 50_000
+
+_LEAF = -1   # sklearn menandai leaf dengan children_left == -1
+
+HEART_REFERENCE_PATH = "models/heart_reference.json"
+
+
+# =========================
+# LOGISTIC REGRESSION (HEART)
+# =========================
+def load_heart_reference(path=HEART_REFERENCE_PATH):
+    """Baca rata-rata & standar deviasi referensi per fitur: {fitur: {"mean", "std"}}."""
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)["features"]
+
+
+class HeartLinearExplainer:
+    """Kontribusi fitur Logistic Regression relatif terhadap pasien referensi.
+
+    `contribution_j = coef_j * (x_j - mean_j)` dalam satuan log-odds, sehingga
+    fitur bersatuan besar (kolesterol, tekanan darah) tidak lagi mendominasi
+    hanya karena nilainya besar, dan
+    `expected_value + contributions.sum(axis=1) == decision_function(X)`.
+    """
+
+    def __init__(self, model, reference):
+        self.feature_names = list(model.feature_names_in_)
+        self.coef = model.coef_[0]
+        self.mean = np.array([reference[f]["mean"] for f in self.feature_names])
+        self.std = np.array([reference[f]["std"] for f in self.feature_names])
+
+        # Suku referensi per fitur (coef * mean) dihitung sekali, bukan tiap submit
+        self.reference_terms = self.coef * self.mean
+        self.expected_value = model.intercept_[0] + self.reference_terms.sum()
+
+    def explain(self, X):
+        """Kembalikan matriks kontribusi (n_baris, 13) dalam satu operasi array."""
+        if hasattr(X, "columns"):
+            X = X[self.feature_names]
+        return np.asarray(X, dtype=float) * self.coef - self.reference_terms
+
+    def zscores(self, X):
+        """Jarak tiap input dari rata-rata referensi dalam satuan standar deviasi."""
+        if hasattr(X, "columns"):
+            X = X[self.feature_names]
+        return (np.asarray(X, dtype=float) - self.mean) / self.std
+
+
+# =========================
+# ADABOOST (SLEEP PIPELINE)
+# =========================
+class SleepTreeExplainer:
+    """Atribusi path-based (Saabas) untuk Pipeline scaler + AdaBoost (SAMME).
+
+    Semua pohon di `estimators_` diratakan menjadi satu set array node, lalu
+    seluruh pohon ditelusuri bersamaan per level kedalaman. Output setiap pohon
+    mengikuti `AdaBoostClassifier.decision_function`: `w` untuk kelas yang
+    diprediksi dan `-w / (K - 1)` untuk kelas lain, dibagi total bobot.
+
+    Hasilnya dalam ruang decision function per kelas:
+    `bias + contributions.sum(axis=1) == decision_function(X)`.
+    Untuk decision stump (depth 1, seperti model saat ini) nilai Saabas sama
+    persis dengan TreeSHAP.
+    """
+
+    def __init__(self, pipeline):
+        self.scaler = pipeline[:-1]
+        booster = pipeline[-1]
+
+        self.classes_ = booster.classes_
+        self.feature_names = list(pipeline.feature_names_in_)
+        n_classes = len(self.classes_)
+        total_weight = booster.estimator_weights_.sum()
+
+        features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+        offset = 0
+        max_depth = 0
+        for est, w in zip(booster.estimators_, booster.estimator_weights_):
+            tree = est.tree_
+            n = tree.node_count
+            left = tree.children_left
+            right = tree.children_right
+            is_leaf = left == _LEAF
+
+            # Output leaf: one-hot kelas prediksi pohon, dibobot seperti SAMME
+            leaf_class = np.searchsorted(
+                self.classes_, est.classes_.take(tree.value[:, 0, :].argmax(axis=1))
+            )
+            node_value = np.full((n, n_classes), -w / (n_classes - 1))
+            node_value[np.arange(n), leaf_class] = w
+            node_value /= total_weight
+
+            # Node internal: rata-rata leaf di bawahnya, dibobot jumlah sampel
+            # training (child selalu punya indeks lebih besar dari parent)
+            cover = tree.n_node_samples.astype(float)
+            for i in range(n - 1, -1, -1):
+                if not is_leaf[i]:
+                    l, r = left[i], right[i]
+                    node_value[i] = (cover[l] * node_value[l] + cover[r] * node_value[r]) / cover[i]
+
+            features.append(np.where(is_leaf, 0, tree.feature))
+            thresholds.append(tree.threshold)
+            # Leaf menunjuk ke dirinya sendiri supaya traversal bisa terus berjalan
+            self_idx = np.arange(n) + offset
+            lefts.append(np.where(is_leaf, self_idx, left + offset))
+            rights.append(np.where(is_leaf, self_idx, right + offset))
+            values.append(node_value)
+            roots.append(offset)
+
+            offset += n
+            max_depth = max(max_depth, tree.max_depth)
+
+        self.feature = np.concatenate(features)
+        self.threshold = np.concatenate(thresholds)
+        self.left = np.concatenate(lefts)
+        self.right = np.concatenate(rights)
+        self.value = np.concatenate(values)
+        self.roots = np.asarray(roots)
+        self.max_depth = max_depth
+        self.expected_value = self.value[self.roots].sum(axis=0)   # bias per kelas
+
+    def explain(self, X):
+        """Kembalikan kontribusi berbentuk (n_baris, n_fitur, n_kelas)."""
+        X = self.scaler.transform(X)
+        out = np.empty((X.shape[0], X.shape[1], len(self.classes_)))
+        for start in range(0, X.shape[0], CHUNK_ROWS):
+            stop = start + CHUNK_ROWS
+            out[start:stop] = self._explain_scaled(X[start:stop])
+        return out
+
+    def _explain_scaled(self, X):
+        # Pohon sklearn membandingkan fitur dalam float32
+        X = np.asarray(X, dtype=np.float32)
+        n_rows, n_features = X.shape
+        n_classes = self.value.shape[1]
+
+        node = np.broadcast_to(self.roots, (n_rows, len(self.roots)))
+        row_idx = np.arange(n_rows)[:, None]
+        flat = np.zeros((n_classes, n_rows * n_features))
+
+        for _ in range(self.max_depth):
+            feat = self.feature[node]
+            go_left = X[row_idx, feat] <= self.threshold[node]
+            child = np.where(go_left, self.left[node], self.right[node])
+            delta = self.value[child] - self.value[node]
+
+            # Akumulasi delta ke (baris, fitur) untuk semua pohon sekaligus
+            bins = (row_idx * n_features + feat).ravel()
+            for k in range(n_classes):
+                flat[k] += np.bincount(bins, weights=delta[..., k].ravel(), minlength=flat.shape[1])
+            node = child
+
+        return flat.T.reshape(n_rows, n_features, n_classes)
@@ -0,0 +1,187 @@
+"""Baca file bulk per record batch dan tulis hasil scoring secara bertahap.
+
+Input Parquet / Arrow IPC / CSV dibaca per batch dan hanya kolom yang dibutuhkan
+model yang diproyeksikan. Setiap batch dikonversi ke DataFrame dengan
+`split_blocks=True`, sehingga kolom numerik tanpa null menjadi view NumPy di atas
+buffer Arrow (tanpa salinan). Hasil ditulis per batch ke `ResultSink`, jadi
+memori puncak mengikuti ukuran batch, bukan ukuran file.
+"""
+
+import csv
+import os
+
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.ipc as pa_ipc
+import pyarrow.parquet as pq
+
+from utils.precision import to_precision
+from utils.scoring import SCORERS
+
+# =========================
+# KONSTANTA
+# =========================
+BATCH_ROWS = 65_536
+CSV_BLOCK_BYTES = 8 << 20   # ukuran blok baca CSV (8 MB)
+
+INPUT_FORMATS = {
+    ".parquet":  "parquet",
+    ".pq":       "parquet",
+    ".arrow":    "ipc",
+    ".feather":  "ipc",
+    ".ipc":      "ipc",
+    ".csv":      "csv",
+}
+
+
+def detect_format(source):
+    """Tebak format dari nama file (path atau objek upload dengan atribut `.name`)."""
+    name = source if isinstance(source, (str, os.PathLike)) else getattr(source, "name", "")
+    ext = os.path.splitext(str(name))[1].lower()
+    if ext not in INPUT_FORMATS:
+        raise ValueError(f"Format file tidak didukung: '{ext}' (pakai .parquet, .arrow, atau .csv)")
+    return INPUT_FORMATS[ext]
+
+
+# =========================
+# BACA
+# =========================
+def _open(source):
+    # Path dibuka lewat memory map supaya batch Parquet/IPC tidak perlu disalin ke heap
+    if isinstance(source, (str, os.PathLike)):
+        return pa.memory_map(str(source))
+    return source
+
+
+def _csv_header(f):
+    """Nama kolom di baris pertama CSV; posisi baca dikembalikan ke awal."""
+    head = b""
+    while b"\n" not in head:
+        chunk = f.read(1 << 16)
+        if not chunk:
+            break
+        head += chunk
+    f.seek(0)
+    line = head.split(b"\n", 1)[0].decode("utf-8-sig").rstrip("\r")
+    return next(csv.reader([line]), [])
+
+
+def _iter_record_batches(source, columns, batch_rows):
+    fmt = detect_format(source)
+    f = _open(source)
+
+    if fmt == "parquet":
+        pf = pq.ParquetFile(f)
+        present = [c for c in columns if c in pf.schema_arrow.names]
+        yield from pf.iter_batches(batch_size=batch_rows, columns=present)
+
+    elif fmt == "ipc":
+        try:
+            reader = pa_ipc.open_file(f)
+            batches = (reader.get_batch(i) for i in range(reader.num_record_batches))
+        except pa.ArrowInvalid:
+            f.seek(0)
+            batches = pa_ipc.open_stream(f)
+        for batch in batches:
+            present = [c for c in columns if c in batch.schema.names]
+            yield batch.select(present)
+
+    else:
+        # Kolom yang tidak ada di header tidak dibaca, supaya validasi melaporkannya
+        # sebagai "kolom tidak ada"
+        header = _csv_header(f)
+        present = [c for c in columns if c in header]
+        # Semua kolom dibaca sebagai string: tipe hasil inferensi blok pertama bisa
+        # gagal di blok berikutnya (label "Typical Angina" setelah ribuan kode angka,
+        # atau sel "abc"). Konversi ke angka dilakukan per sel di `encode_frame`,
+        # jadi nilai buruk menjadi baris yang ditolak, bukan error di tengah file.
+        reader = pa_csv.open_csv(
+            f,
+            read_options=pa_csv.ReadOptions(block_size=CSV_BLOCK_BYTES),
+            convert_options=pa_csv.ConvertOptions(
+                include_columns=present or None,
+                column_types={c: pa.string() for c in present or header},
+                strings_can_be_null=True,   # sel kosong tetap null (-> "kosong / bukan angka")
+            ),
+        )
+        for batch in reader:
+            yield batch.select(present)
+
+
+def iter_record_batches(source, columns, batch_rows=BATCH_ROWS):
+    """Yield `pa.RecordBatch` berisi `columns` (yang ada di file), maks. `batch_rows` baris."""
+    for batch in _iter_record_batches(source, columns, batch_rows):
+        # Batch CSV bisa lebih besar dari batch_rows (per blok), potong lagi
+        for start in range(0, batch.num_rows, batch_rows):
+            yield batch.slice(start, batch_rows)
+
+
+def iter_batches(source, columns, batch_rows=BATCH_ROWS):
+    """Yield DataFrame per batch yang hanya berisi `columns` (yang ada di file)."""
+    for batch in iter_record_batches(source, columns, batch_rows):
+        yield batch.to_pandas(split_blocks=True)
+
+
+# =========================
+# TULIS
+# =========================
+class ResultSink:
+    """Tulis hasil scoring per batch ke Parquet atau CSV (path atau file-like)."""
+
+    def __init__(self, target, fmt="parquet"):
+        if fmt not in ("parquet", "csv"):
+            raise ValueError(f"Format output tidak didukung: '{fmt}'")
+        self.target = target
+        self.fmt = fmt
+        self.schema = None
+        self.rows = 0
+        self._writer = None
+
+    def write(self, df):
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        if self._writer is None:
+            self.schema = table.schema
+            if self.fmt == "parquet":
+                self._writer = pq.ParquetWriter(self.target, self.schema)
+            else:
+                self._writer = pa_csv.CSVWriter(self.target, self.schema)
+        else:
+            table = table.cast(self.schema)
+        self._writer.write_table(table)
+        self.rows += len(df)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# =========================
+# PIPELINE
+# =========================
+def score_file(model, kind, source, sink, batch_rows=BATCH_ROWS, on_batch=None, precision="float64",
+               on_result=None):
+    """Skor seluruh file per batch dan tulis ke `sink`; kembalikan (n_baris, n_ditolak).
+
+    `on_batch(n_baris_selesai)` dipanggil setelah setiap batch (mis. untuk progress bar),
+    `on_result(hasil_batch)` menerima DataFrame output scorer (mis. untuk analitik).
+    `precision="float32"` memakai model float32 dari `utils.precision` (hemat memori).
+    """
+    scorer, columns = SCORERS[kind]
+    model = to_precision(model, kind, precision)
+    n_rows = n_rejected = 0
+    for frame in iter_batches(source, columns, batch_rows):
+        result = scorer(model, frame, row_offset=n_rows)
+        sink.write(result)
+        if on_result is not None:
+            on_result(result)
+        n_rows += len(frame)
+        n_rejected += int(result["prediksi"].isna().sum())
+        if on_batch is not None:
+            on_batch(n_rows)
+    return n_rows, n_rejected
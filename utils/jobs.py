@@ -0,0 +1,404 @@
+"""Job runner lokal untuk scoring bulk: resumable, checkpoint per chunk, adil.
+
+Setiap file yang dikirim menjadi satu job dengan folder sendiri di `JOBS_DIR`:
+
+    <id>/job.json            status + progress (ditulis atomik setelah setiap chunk)
+    <id>/input.<ext>         salinan file upload
+    <id>/staged.arrow        input dipecah per chunk (Arrow IPC, satu record batch per chunk)
+    <id>/parts/00000.parquet hasil per chunk
+    <id>/hasil.<fmt>         hasil akhir setelah semua chunk selesai
+
+Giliran pertama sebuah job menyalin kolom yang dibutuhkan ke `staged.arrow`;
+setelah itu chunk ke-i bisa dibaca langsung (memory map, tanpa membaca ulang
+chunk sebelumnya), jadi job bisa dilanjutkan dari chunk terakhir yang tercatat
+di `job.json` setelah crash / restart server.
+
+`JobRunner` menjalankan job di pool proses worker. Setiap giliran maksimal
+`SLICE_CHUNKS` chunk, lalu job kembali ke antrean; job yang paling lama tidak
+dilayani selalu didahulukan (round-robin), sehingga file besar tidak menahan
+job kecil. Satu job hanya dikerjakan satu worker pada satu waktu.
+"""
+
+import datetime
+import functools
+import json
+import logging
+import multiprocessing
+import os
+import shutil
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import pyarrow as pa
+import pyarrow.ipc as pa_ipc
+import pyarrow.parquet as pq
+
+from utils.analytics import cohort_stats
+from utils.ingest import BATCH_ROWS, ResultSink, detect_format, iter_record_batches
+from utils.models import load_heart_model, load_sleep_model
+from utils.precision import PRECISIONS, to_precision
+from utils.scoring import SCORERS, cohort_summary
+
+try:
+    import fcntl
+except ImportError:   # Windows: tanpa kunci antar proses
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# =========================
+# KONSTANTA
+# =========================
+JOBS_DIR = "data/jobs"
+JOB_WORKERS = int(os.environ.get("JOB_WORKERS", 2))   # jumlah proses worker
+CHUNK_ROWS = BATCH_ROWS
+SLICE_CHUNKS = 8        # chunk per giliran sebelum job kembali ke antrean
+POLL_SECONDS = 0.5      # interval scheduler memeriksa job baru / selesai
+MAX_CRASHES = 3         # worker mati berturut-turut pada job yang sama -> job gagal
+LOCK_NAME = "runner.lock"   # kunci eksklusif JobRunner di dalam JOBS_DIR
+
+STATUS_QUEUED    = "antre"
+STATUS_RUNNING   = "berjalan"
+STATUS_DONE      = "selesai"
+STATUS_FAILED    = "gagal"
+STATUS_CANCELLED = "dibatalkan"
+
+FINAL_STATUSES = (STATUS_DONE, STATUS_FAILED, STATUS_CANCELLED)
+
+_INPUT_EXT = {"parquet": ".parquet", "ipc": ".arrow", "csv": ".csv"}
+
+
+# =========================
+# STATE DI DISK
+# =========================
+def _job_dir(job_id):
+    return os.path.join(JOBS_DIR, job_id)
+
+
+def _now():
+    return datetime.datetime.now().isoformat(timespec="seconds")
+
+
+def read_job(job_id):
+    with open(os.path.join(_job_dir(job_id), "job.json"), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _write_job(job_dir, state):
+    state["updated"] = _now()
+    path = os.path.join(job_dir, "job.json")
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(state, f)
+    os.replace(tmp, path)
+
+
+def _cancel_requested(job_id):
+    return os.path.exists(os.path.join(_job_dir(job_id), "cancel"))
+
+
+def list_jobs(kind=None):
+    """Semua job (terbaru dulu), opsional hanya untuk satu model."""
+    if not os.path.isdir(JOBS_DIR):
+        return []
+    jobs = []
+    for job_id in os.listdir(JOBS_DIR):
+        if not os.path.isdir(_job_dir(job_id)):
+            continue   # file kunci runner
+        try:
+            state = read_job(job_id)
+        except (FileNotFoundError, json.JSONDecodeError):
+            continue   # folder yang sedang dibuat / dihapus
+        if kind is None or state["kind"] == kind:
+            jobs.append(state)
+    return sorted(jobs, key=lambda s: s["created"], reverse=True)
+
+
+def result_path(state, job_dir=None):
+    return os.path.join(job_dir or _job_dir(state["id"]), f"hasil.{state['fmt']}")
+
+
+# =========================
+# API UNTUK HALAMAN
+# =========================
+def submit_job(kind, source, fmt="parquet", precision="float64"):
+    """Salin file (path atau upload) ke folder job baru dan masukkan ke antrean; kembalikan id."""
+    if fmt not in ("parquet", "csv"):
+        raise ValueError(f"Format output tidak didukung: '{fmt}'")
+    if precision not in PRECISIONS:
+        raise ValueError(f"Presisi tidak didukung: '{precision}'")
+    input_name = "input" + _INPUT_EXT[detect_format(source)]
+    name = os.path.basename(str(source if isinstance(source, (str, os.PathLike)) else source.name))
+
+    job_id = datetime.datetime.now().strftime("%Y%m%d-%H%M%S-") + uuid.uuid4().hex[:6]
+    job_dir = _job_dir(job_id)
+    os.makedirs(os.path.join(job_dir, "parts"))
+    if isinstance(source, (str, os.PathLike)):
+        shutil.copyfile(source, os.path.join(job_dir, input_name))
+    else:
+        source.seek(0)
+        with open(os.path.join(job_dir, input_name), "wb") as f:
+            shutil.copyfileobj(source, f)
+
+    _write_job(job_dir, {
+        "id":           job_id,
+        "kind":         kind,
+        "name":         name,
+        "input":        input_name,
+        "fmt":          fmt,
+        "precision":    precision,
+        "status":       STATUS_QUEUED,
+        "staged":       False,
+        "n_chunks":     None,
+        "total_rows":   None,
+        "chunks_done":  0,
+        "rows_done":    0,
+        "n_rejected":   0,
+        "created":      _now(),
+        "error":        None,
+    })
+    _wake_runner()
+    return job_id
+
+
+def cancel_job(job_id):
+    """Minta job berhenti; dihentikan di batas chunk berikutnya."""
+    open(os.path.join(_job_dir(job_id), "cancel"), "w").close()
+    _wake_runner()
+
+
+def delete_job(job_id):
+    """Hapus folder job yang sudah final (selesai / gagal / dibatalkan)."""
+    if read_job(job_id)["status"] not in FINAL_STATUSES:
+        raise ValueError("Job masih berjalan; batalkan dulu sebelum dihapus")
+    shutil.rmtree(_job_dir(job_id))
+
+
+# =========================
+# WORKER (berjalan di proses terpisah)
+# =========================
+@functools.lru_cache(maxsize=None)
+def _worker_model(kind, precision):
+    model = load_heart_model() if kind == "heart" else load_sleep_model()
+    return to_precision(model, kind, precision)
+
+
+def _stage(state, job_dir):
+    """Tulis kolom yang dibutuhkan ke Arrow IPC, satu record batch per chunk."""
+    _, columns = SCORERS[state["kind"]]
+    path = os.path.join(job_dir, "staged.arrow")
+    tmp = path + ".tmp"
+    writer = None
+    n_chunks = total_rows = 0
+    try:
+        for batch in iter_record_batches(os.path.join(job_dir, state["input"]), columns, CHUNK_ROWS):
+            if writer is None:
+                writer = pa_ipc.new_file(tmp, batch.schema)
+            writer.write_batch(batch)
+            n_chunks += 1
+            total_rows += batch.num_rows
+    finally:
+        if writer is not None:
+            writer.close()
+    if writer is None:
+        raise ValueError("File tidak berisi baris data")
+    os.replace(tmp, path)
+    state.update(staged=True, n_chunks=n_chunks, total_rows=total_rows)
+
+
+def _finalize(state, job_dir):
+    """Gabungkan hasil per chunk menjadi satu file hasil, lalu hapus parts."""
+    parts = os.path.join(job_dir, "parts")
+    tmp = os.path.join(job_dir, f"hasil.tmp.{state['fmt']}")
+    with ResultSink(tmp, state["fmt"]) as sink:
+        for i in range(state["n_chunks"]):
+            sink.write(pq.read_table(os.path.join(parts, f"{i:05d}.parquet")).to_pandas())
+    os.replace(tmp, result_path(state, job_dir))
+    shutil.rmtree(parts, ignore_errors=True)
+    os.remove(os.path.join(job_dir, "staged.arrow"))
+    state["status"] = STATUS_DONE
+
+
+def run_slice(job_dir, max_chunks=SLICE_CHUNKS, slice_id=None):
+    """Kerjakan maks. `max_chunks` chunk berikutnya dari satu job.
+
+    Kembalikan (state terbaru, ringkasan analitik per chunk yang selesai); ringkasan
+    dicatat scheduler di proses server, bukan di worker.
+
+    Progress dicatat setelah setiap chunk: hasil chunk ditulis atomik dulu, baru
+    `job.json`. Jika proses mati di antaranya, chunk itu dikerjakan ulang dan
+    hasilnya menimpa file yang sama. `slice_id` dicatat sebelum mulai bekerja,
+    supaya scheduler tahu giliran mana yang benar-benar sudah dijalankan worker.
+    """
+    with open(os.path.join(job_dir, "job.json"), encoding="utf-8") as f:
+        state = json.load(f)
+
+    if slice_id is not None:
+        state["slice_id"] = slice_id
+        _write_job(job_dir, state)
+
+    summaries = []
+    try:
+        if os.path.exists(os.path.join(job_dir, "cancel")):
+            state["status"] = STATUS_CANCELLED
+            _write_job(job_dir, state)
+            return state, []
+
+        state["status"] = STATUS_RUNNING
+        if not state["staged"]:
+            _stage(state, job_dir)
+            _write_job(job_dir, state)
+
+        scorer, _ = SCORERS[state["kind"]]
+        model = _worker_model(state["kind"], state["precision"])
+        reader = pa_ipc.open_file(pa.memory_map(os.path.join(job_dir, "staged.arrow")))
+
+        stop = min(state["chunks_done"] + max_chunks, state["n_chunks"])
+        for i in range(state["chunks_done"], stop):
+            if os.path.exists(os.path.join(job_dir, "cancel")):
+                state["status"] = STATUS_CANCELLED
+                break
+            frame = reader.get_batch(i).to_pandas(split_blocks=True)
+            result = scorer(model, frame, row_offset=state["rows_done"])
+
+            part = os.path.join(job_dir, "parts", f"{i:05d}.parquet")
+            pq.write_table(pa.Table.from_pandas(result, preserve_index=False), part + ".tmp")
+            os.replace(part + ".tmp", part)
+
+            state["chunks_done"] = i + 1
+            state["rows_done"] += len(frame)
+            state["n_rejected"] += int(result["prediksi"].isna().sum())
+            _write_job(job_dir, state)
+            summaries.append(cohort_summary(result, state["kind"]))
+
+        if state["status"] == STATUS_RUNNING and state["chunks_done"] == state["n_chunks"]:
+            _finalize(state, job_dir)
+    except Exception as exc:
+        state["status"] = STATUS_FAILED
+        state["error"] = f"{type(exc).__name__}: {exc}"
+
+    _write_job(job_dir, state)
+    return state, summaries
+
+
+# =========================
+# SCHEDULER
+# =========================
+class JobRunner:
+    """Scheduler di proses Streamlit + pool proses worker (dibuat saat pertama dipakai).
+
+    Job yang belum final di disk (termasuk yang terputus karena restart) otomatis
+    dilanjutkan. Hanya satu JobRunner per `JOBS_DIR` yang boleh aktif: runner
+    memegang `flock` eksklusif atas `LOCK_NAME` (dilepas OS saat proses berhenti),
+    dan runner kedua gagal dengan RuntimeError.
+    """
+
+    def __init__(self, workers=JOB_WORKERS):
+        self._lock_file = open(os.path.join(JOBS_DIR, LOCK_NAME), "a")
+        if fcntl is not None:
+            try:
+                fcntl.flock(self._lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                self._lock_file.close()
+                raise RuntimeError(f"JobRunner lain sudah aktif untuk '{JOBS_DIR}'") from None
+        self.workers = workers
+        self._pool = None
+        self._active = {}          # id job -> Future giliran yang sedang berjalan
+        self._slices = {}          # id job -> (id giliran, pool tempat giliran dikirim)
+        self._last_served = {}     # id job -> waktu giliran terakhir dimulai
+        self._crashes = {}         # id job -> jumlah worker mati berturut-turut
+        self._wake = threading.Event()
+        self._thread = threading.Thread(target=self._loop, name="job-runner", daemon=True)
+        self._thread.start()
+
+    def wake(self):
+        self._wake.set()
+
+    def _loop(self):
+        while True:
+            try:
+                self._schedule()
+            except Exception:
+                # Scheduler tidak boleh mati; dicoba lagi di putaran berikutnya
+                logger.exception("Putaran scheduler job gagal")
+            self._wake.wait(POLL_SECONDS)
+            self._wake.clear()
+
+    def _schedule(self):
+        for job_id, future in list(self._active.items()):
+            if future.done():
+                del self._active[job_id]
+                slice_id, pool = self._slices.pop(job_id)
+                exc = future.exception()
+                if exc is None:
+                    self._crashes.pop(job_id, None)
+                    state, summaries = future.result()
+                    for summary in summaries:
+                        cohort_stats(state["kind"]).add_summary(summary)
+                    continue
+                # Proses worker mati (mis. kehabisan memori): pool dibuat ulang sekali
+                # dan job dilanjutkan dari checkpoint terakhir, kecuali terus berulang
+                if isinstance(exc, BrokenProcessPool) and pool is self._pool:
+                    self._pool.shutdown(wait=False, cancel_futures=True)
+                    self._pool = None
+                # Semua Future di pool yang rusak ikut gagal; hanya job yang gilirannya
+                # sudah dimulai worker yang dihitung crash, sisanya antre ulang
+                state = read_job(job_id)
+                if state.get("slice_id") != slice_id:
+                    continue
+                self._crashes[job_id] = self._crashes.get(job_id, 0) + 1
+                if self._crashes[job_id] >= MAX_CRASHES:
+                    state["status"] = STATUS_FAILED
+                    state["error"] = f"Worker berhenti mendadak {MAX_CRASHES}x: {exc!r}"
+                    _write_job(_job_dir(job_id), state)
+
+        runnable = []
+        for state in list_jobs():
+            if state["status"] in FINAL_STATUSES or state["id"] in self._active:
+                continue
+            if _cancel_requested(state["id"]) and state["status"] == STATUS_QUEUED:
+                state["status"] = STATUS_CANCELLED
+                _write_job(_job_dir(state["id"]), state)
+                continue
+            runnable.append(state)
+
+        # Yang paling lama tidak dilayani lebih dulu; job baru (belum pernah) paling depan
+        runnable.sort(key=lambda s: (self._last_served.get(s["id"], 0.0), s["created"]))
+        for state in runnable[:self.workers - len(self._active)]:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            self._last_served[state["id"]] = time.monotonic()
+            slice_id = uuid.uuid4().hex
+            future = self._pool.submit(run_slice, _job_dir(state["id"]), slice_id=slice_id)
+            future.add_done_callback(lambda _: self.wake())
+            self._active[state["id"]] = future
+            self._slices[state["id"]] = (slice_id, self._pool)
+
+
+# Satu runner per proses server, dibagi oleh semua halaman & sesi
+_RUNNER = None
+_RUNNER_LOCK = threading.Lock()
+
+
+def job_runner():
+    """Runner proses ini; None jika proses lain sudah menjalankan runner untuk `JOBS_DIR`."""
+    global _RUNNER
+    with _RUNNER_LOCK:
+        if _RUNNER is None:
+            os.makedirs(JOBS_DIR, exist_ok=True)
+            try:
+                _RUNNER = JobRunner()
+            except RuntimeError:
+                return None   # runner proses lain membaca antrean di disk secara berkala
+        return _RUNNER
+
+
+def _wake_runner():
+    runner = job_runner()
+    if runner is not None:
+        runner.wake()
@@ -0,0 +1,36 @@
+"""Lokasi model + loader untuk kode di luar Streamlit (bulk, job, evaluasi)."""
+
+import functools
+
+import joblib
+
+# =========================
+# KONSTANTA
+# =========================
+HEART_MODEL_PATH = "models/logistic_regression_model.pkl"
+SLEEP_MODEL_PATH = "models/adaboost_sleep_model.pkl"
+
+# Urutan kolom input model (sama dengan `feature_names_in_`)
+HEART_FEATURES = [
+    "age", "sex", "chest_pain_type", "resting_blood_pressure", "cholesterol",
+    "fasting_blood_sugar", "resting_electrocardiogram", "max_heart_rate_achieved",
+    "exercise_induced_angina", "st_depression", "st_slope", "num_major_vessels",
+    "thalassemia",
+]
+
+SLEEP_FEATURES = [
+    "Gender", "Age", "Occupation", "Sleep_Duration", "Quality_of_Sleep",
+    "Physical_Activity", "Stress_Level", "Heart_Rate", "Daily_Steps",
+    "Systolic_BP", "Diastolic_BP",
+]
+
+
+# Halaman Streamlit tetap memakai st.cache_resource; ini untuk proses lain
+@functools.lru_cache(maxsize=None)
+def load_heart_model():
+    return joblib.load(HEART_MODEL_PATH)
+
+
+@functools.lru_cache(maxsize=None)
+def load_sleep_model():
+    return joblib.load(SLEEP_MODEL_PATH)
@@ -0,0 +1,170 @@
+"""Index nearest-neighbour untuk mencari pasien serupa dari riwayat prediksi."""
+
+import os
+import re
+import threading
+
+import joblib
+import numpy as np
+from sklearn.neighbors import KDTree
+
+# =========================
+# KONSTANTA
+# =========================
+NEIGHBORS_DIR = "data/neighbors"
+
+# Baris baru ditampung dulu di buffer "pending" (dicari linear) lalu digabung
+# ke KD-tree di background setelah melewati batas ini
+MIN_PENDING = 2048
+PENDING_RATIO = 0.02   # batas pending juga tumbuh 2% dari ukuran index utama
+
+LEAF_SIZE = 40
+
+
+class NeighborIndex:
+    """KD-tree atas vektor fitur terstandarisasi + label hasil prediksi.
+
+    Layout di disk (`directory/`):
+    - `index.joblib`     : tuple (KDTree, label) data utama dalam satu file yang
+                           diganti atomik; di-load dengan `mmap_mode="r"`
+    - `pending-<n>.bin`  : record float64 append-only `[fitur..., label]` yang belum
+                           masuk ke tree; `<n>` = jumlah baris tree saat file ini
+                           dibuat (nomor urut baris pertamanya)
+
+    Jika proses mati setelah index baru dipublish tetapi sebelum pending ditulis
+    ulang, baris pending yang nomornya < jumlah baris tree dibuang saat start,
+    jadi tidak ada pasien yang masuk dua kali.
+
+    Rebuild tree berjalan di thread background, jadi `add()` tetap cepat;
+    selama rebuild, query tetap memakai tree lama + buffer pending.
+
+    State yang dibaca query adalah satu tuple immutable `(tree, labels, pending)`
+    di `self._state`; setiap perubahan membangun tuple baru lalu menggantinya
+    dengan satu assignment di bawah lock, jadi query tidak pernah melihat tree
+    baru dengan label / pending lama (atau sebaliknya).
+    """
+
+    def __init__(self, directory, n_features):
+        self.directory = directory
+        self.n_features = n_features
+        self._lock = threading.Lock()
+        self._rebuilding = False
+
+        os.makedirs(directory, exist_ok=True)
+        self._index_path = os.path.join(directory, "index.joblib")
+
+        tree, labels = None, np.empty(0, dtype=np.int8)
+        if os.path.exists(self._index_path):
+            tree, labels = joblib.load(self._index_path, mmap_mode="r")
+
+        width = n_features + 1
+        files = self._pending_files()
+        pending = np.empty((0, width))
+        if files:
+            start, name = files[-1]
+            data = np.fromfile(os.path.join(directory, name))
+            data = data[:len(data) // width * width].reshape(-1, width)   # record terakhir bisa terpotong
+            pending = data[max(len(labels) - start, 0):]
+        self._write_pending(len(labels), pending)
+
+        self._state = (tree, labels, pending)
+        self._maybe_rebuild()
+
+    def __len__(self):
+        _, labels, pending = self._state
+        return len(labels) + len(pending)
+
+    # =========================
+    # FILE PENDING
+    # =========================
+    def _pending_files(self):
+        """[(nomor baris pertama, nama file)] urut naik."""
+        return sorted(
+            (int(m.group(1)), name)
+            for name in os.listdir(self.directory)
+            if (m := re.fullmatch(r"pending-(\d+)\.bin", name))
+        )
+
+    def _write_pending(self, start, pending):
+        """Tulis ulang pending sebagai `pending-<start>.bin` (atomik), hapus file lama."""
+        path = os.path.join(self.directory, f"pending-{start}.bin")
+        with open(path + ".tmp", "wb") as f:
+            pending.tofile(f)
+        os.replace(path + ".tmp", path)
+        for _, name in self._pending_files():
+            if name != os.path.basename(path):
+                os.remove(os.path.join(self.directory, name))
+        self._pending_path = path
+
+    def add(self, X, labels):
+        """Tambahkan baris terstandarisasi (N, n_features) beserta labelnya."""
+        X = np.atleast_2d(np.asarray(X, dtype=float))
+        rows = np.column_stack([X, np.asarray(labels, dtype=float)])
+        with self._lock:
+            with open(self._pending_path, "ab") as f:
+                rows.tofile(f)
+            tree, labels, pending = self._state
+            self._state = (tree, labels, np.concatenate([pending, rows]))
+        self._maybe_rebuild()
+
+    def query(self, x, k=5):
+        """Kembalikan (jarak, label, vektor) untuk k tetangga terdekat dari `x`."""
+        x = np.atleast_2d(np.asarray(x, dtype=float))
+        tree, labels, pending = self._state   # satu snapshot konsisten, tanpa lock
+
+        dist, lab, vec = [], [], []
+        if tree is not None:
+            d, idx = tree.query(x, k=min(k, len(labels)))
+            data = tree.get_arrays()[0]
+            dist.append(d[0])
+            lab.append(np.asarray(labels)[idx[0]])
+            vec.append(np.asarray(data[idx[0]]))
+        if len(pending):
+            d = np.sqrt(((pending[:, :-1] - x) ** 2).sum(axis=1))
+            top = np.argsort(d)[:k]
+            dist.append(d[top])
+            lab.append(pending[top, -1].astype(np.int8))
+            vec.append(pending[top, :-1])
+        if not dist:
+            return np.empty(0), np.empty(0, dtype=np.int8), np.empty((0, self.n_features))
+
+        dist, lab, vec = np.concatenate(dist), np.concatenate(lab), np.concatenate(vec)
+        order = np.argsort(dist)[:k]
+        return dist[order], lab[order], vec[order]
+
+    # =========================
+    # REBUILD (background)
+    # =========================
+    def _maybe_rebuild(self):
+        with self._lock:
+            tree, labels, pending = self._state
+            limit = max(MIN_PENDING, int(len(labels) * PENDING_RATIO))
+            if self._rebuilding or len(pending) < limit:
+                return
+            self._rebuilding = True
+        n_merged = len(pending)
+        base = tree.get_arrays()[0] if tree is not None else np.empty((0, self.n_features))
+        data = np.concatenate([base, pending[:, :-1]])
+        labels = np.concatenate([labels, pending[:, -1].astype(np.int8)])
+
+        threading.Thread(target=self._rebuild, args=(data, labels, n_merged), daemon=True).start()
+
+    def _rebuild(self, data, labels, n_merged):
+        try:
+            tree = KDTree(data, leaf_size=LEAF_SIZE)
+
+            # Tree + label dalam satu file, dipublish dengan satu os.replace
+            joblib.dump((tree, labels), self._index_path + ".tmp")
+            os.replace(self._index_path + ".tmp", self._index_path)
+            tree, labels = joblib.load(self._index_path, mmap_mode="r")
+
+            with self._lock:
+                # Baris yang masuk selama rebuild tetap di pending
+                pending = self._state[2][n_merged:]
+                self._write_pending(len(labels), pending)
+                self._state = (tree, labels, pending)
+        finally:
+            with self._lock:
+                self._rebuilding = False
+        # Pending bisa sudah melewati batas lagi selama rebuild berjalan
+        self._maybe_rebuild()
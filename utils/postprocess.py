@@ -0,0 +1,50 @@
+"""Post-processing hasil prediksi per kolom (N baris sekaligus) dengan NumPy."""
+
+import numpy as np
+
+# =========================
+# KONSTANTA
+# =========================
+BMI_BINS       = [18.5, 25, 30]
+BMI_CATEGORIES = np.array(["Underweight", "Normal", "Overweight", "Obese"])
+
+SEVERITY_LABELS  = np.array(["🟡 Ringan", "🟠 Sedang", "🔴 Berat"])
+SEVERITY_HEALTHY = "✅ Sehat"
+
+
+# =========================
+# SLEEP
+# =========================
+def sleep_postprocess(height_cm, weight_kg, probabilities, quality_of_sleep, stress_level, sleep_duration):
+    """Hitung BMI, kategori BMI, dan tingkat keparahan untuk N baris sekaligus.
+
+    Semua argumen berupa kolom (array-like panjang N); `probabilities` berbentuk
+    (N, 3) dengan urutan kelas [Sehat, Insomnia, Sleep Apnea]. Form tunggal
+    memanggil fungsi ini dengan N=1 sehingga hasilnya identik dengan jalur bulk.
+    """
+    height_m = np.asarray(height_cm, dtype=float) / 100
+    bmi = np.asarray(weight_kg, dtype=float) / height_m ** 2
+    bmi_category = BMI_CATEGORIES[np.digitize(bmi, BMI_BINS)]
+
+    probabilities = np.atleast_2d(probabilities)
+    pred = probabilities.argmax(axis=1)
+    confidence = probabilities[np.arange(len(pred)), pred] * 100
+
+    # Logic: gabungan confidence + quality_of_sleep + stress_level + sleep_duration
+    severity_score = (
+        np.digitize(confidence, [60, 80])                                   # >=60: +1, >=80: +2
+        + 2 - np.digitize(quality_of_sleep, [3, 5], right=True)             # <=5: +1, <=3: +2
+        + np.digitize(stress_level, [6, 8])                                 # >=6: +1, >=8: +2
+        + (np.asarray(sleep_duration) < 5)                                  # <5 jam: +1
+    )
+    # Mapping score -> label: <=2 Ringan, <=4 Sedang, >4 Berat
+    severity = SEVERITY_LABELS[np.digitize(severity_score, [2, 4], right=True)]
+    severity = np.where(pred == 0, SEVERITY_HEALTHY, severity)
+
+    return {
+        "bmi":            bmi,
+        "bmi_category":   bmi_category,
+        "pred":           pred,
+        "confidence":     confidence,
+        "severity":       severity,
+    }
@@ -0,0 +1,88 @@
+"""Record hasil prediksi form yang ringkas untuk disimpan di `st.session_state`.
+
+Satu record per sesi hanya berisi array NumPy kecil (input ter-encode,
+probabilitas, kontribusi fitur, tetangga terdekat) dan bitmask faktor risiko,
+tanpa DataFrame atau figure Plotly. Halaman membangun tabel & chart dari record
+ini hanya ketika expander yang membutuhkannya dibuka, jadi memori per sesi
+tetap ratusan byte dan record murah untuk di-cache atau di-pickle.
+"""
+
+import numpy as np
+import pandas as pd
+
+from utils.models import HEART_FEATURES, SLEEP_FEATURES
+
+
+# =========================
+# BITMASK FAKTOR RISIKO
+# =========================
+def flags_to_mask(flags, keys):
+    """Bitmask int dari daftar kunci faktor risiko (bit i = `keys[i]`)."""
+    mask = 0
+    for key in flags:
+        mask |= 1 << keys.index(key)
+    return mask
+
+
+def mask_to_flags(mask, keys):
+    """Kebalikan `flags_to_mask`, urut sesuai `keys`."""
+    return [key for i, key in enumerate(keys) if mask >> i & 1]
+
+
+# =========================
+# RECORD
+# =========================
+class PredictionResult:
+    """Hasil satu prediksi form: input, probabilitas, flag, kontribusi, tetangga."""
+
+    __slots__ = ("inputs", "proba", "flags", "contributions", "nb_dist", "nb_labels", "nb_vectors", "n_history")
+
+    features = ()   # urutan kolom `inputs` (diisi subclass)
+
+    def __init__(self, inputs, proba, flags, contributions, neighbors, n_history):
+        self.inputs = np.asarray(inputs, dtype=float)
+        self.proba = np.asarray(proba, dtype=float)
+        self.flags = int(flags)
+        self.contributions = np.asarray(contributions, dtype=float)
+        self.nb_dist, self.nb_labels, self.nb_vectors = (np.asarray(a) for a in neighbors)
+        self.n_history = int(n_history)   # jumlah riwayat di index saat prediksi (tanpa pasien ini)
+
+    @property
+    def prediction(self):
+        return int(self.proba.argmax())
+
+    @property
+    def confidence(self):
+        """Probabilitas kelas prediksi dalam persen."""
+        return float(self.proba.max() * 100)
+
+    @property
+    def values(self):
+        """{fitur: nilai input}, untuk flag & tabel rentang normal."""
+        return dict(zip(self.features, self.inputs.tolist()))
+
+    @property
+    def nbytes(self):
+        arrays = (self.inputs, self.proba, self.contributions, self.nb_dist, self.nb_labels, self.nb_vectors)
+        return sum(a.nbytes for a in arrays)
+
+    def input_frame(self):
+        """DataFrame 1 baris dengan kolom fitur model (dibangun ulang saat dibutuhkan)."""
+        return pd.DataFrame(self.inputs[None], columns=list(self.features))
+
+
+class HeartResult(PredictionResult):
+    __slots__ = ()
+    features = tuple(HEART_FEATURES)
+
+
+class SleepResult(PredictionResult):
+    """Ditambah BMI & keparahan dari `sleep_postprocess` (tidak termasuk input model)."""
+
+    __slots__ = ("bmi", "severity")
+    features = tuple(SLEEP_FEATURES)
+
+    def __init__(self, inputs, proba, flags, contributions, neighbors, n_history, bmi, severity):
+        super().__init__(inputs, proba, flags, contributions, neighbors, n_history)
+        self.bmi = float(bmi)
+        self.severity = str(severity)
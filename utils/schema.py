@@ -0,0 +1,116 @@
+"""Skema input + validasi vektor untuk data bulk (file / API) kedua model.
+
+Batas dan kode kategorikal di sini sama dengan batas widget `st.number_input`,
+`st.slider`, dan `st.selectbox` di halaman `pages/`. Validasi dilakukan per
+kolom dengan operasi array (tanpa loop per baris), dan hasilnya berupa mask
+baris yang ditolak + matriks kode alasan (bit flag per sel).
+"""
+
+import numpy as np
+import pandas as pd
+
+# =========================
+# KODE ALASAN (bit flag, bisa digabung per sel)
+# =========================
+REASON_MISSING_COLUMN = 1    # kolom tidak ada di file
+REASON_INVALID        = 2    # kosong / bukan angka
+REASON_OUT_OF_RANGE   = 4    # di luar batas min/max
+REASON_UNKNOWN_CODE   = 8    # kode / label kategorikal tidak dikenal
+REASON_NOT_INTEGER    = 16   # harus bilangan bulat
+
+REASON_LABELS = {
+    REASON_MISSING_COLUMN:  "kolom tidak ada",
+    REASON_INVALID:         "kosong / bukan angka",
+    REASON_OUT_OF_RANGE:    "di luar rentang",
+    REASON_UNKNOWN_CODE:    "kode / label tidak dikenal",
+    REASON_NOT_INTEGER:     "bukan bilangan bulat",
+}
+
+# =========================
+# SKEMA
+# =========================
+# Setiap entry: kolom -> (min, max, kode yang diizinkan, harus integer)
+# min/max = None untuk kolom kategorikal (dicek lewat kode yang diizinkan)
+HEART_SCHEMA = {
+    "age":                          (1,     120,    None,           True),
+    "sex":                          (None,  None,   [0, 1],         True),
+    "chest_pain_type":              (None,  None,   [0, 1, 2, 3],   True),
+    "resting_blood_pressure":       (80,    220,    None,           True),
+    "cholesterol":                  (100,   600,    None,           True),
+    "fasting_blood_sugar":          (None,  None,   [0, 1],         True),
+    "resting_electrocardiogram":    (None,  None,   [0, 1, 2],      True),
+    "max_heart_rate_achieved":      (60,    220,    None,           True),
+    "exercise_induced_angina":      (None,  None,   [0, 1],         True),
+    "st_depression":                (0.0,   10.0,   None,           False),
+    "st_slope":                     (None,  None,   [0, 1, 2],      True),
+    "num_major_vessels":            (None,  None,   [0, 1, 2, 3],   True),
+    "thalassemia":                  (None,  None,   [1, 2, 3],      True),
+}
+
+SLEEP_SCHEMA = {
+    "Gender":             (None,  None,   [0, 1],   True),
+    "Age":                (10,    100,    None,     True),
+    "Occupation":         (0,     9,      None,     True),
+    "Sleep_Duration":     (0.0,   12.0,   None,     False),
+    "Quality_of_Sleep":   (1,     10,     None,     True),
+    "Physical_Activity":  (0,     120,    None,     True),
+    "Stress_Level":       (1,     10,     None,     True),
+    "Heart_Rate":         (40,    120,    None,     True),
+    "Daily_Steps":        (0,     30000,  None,     True),
+    "Systolic_BP":        (80,    200,    None,     True),
+    "Diastolic_BP":       (50,    130,    None,     True),
+}
+
+# Kolom tambahan untuk perhitungan BMI (tidak masuk ke model)
+SLEEP_BODY_SCHEMA = {
+    "Height_cm":          (100,   250,    None,     True),
+    "Weight_kg":          (30.0,  200.0,  None,     False),
+}
+
+
+# =========================
+# VALIDASI
+# =========================
+class ValidationResult:
+    """Hasil validasi N baris: `rejected` (N,) bool dan `reasons` (N, n_kolom) uint8."""
+
+    def __init__(self, columns, rejected, reasons):
+        self.columns = columns
+        self.rejected = rejected
+        self.reasons = reasons
+
+    @property
+    def n_rejected(self):
+        return int(self.rejected.sum())
+
+
+def describe_reason(code):
+    return ", ".join(label for bit, label in REASON_LABELS.items() if code & bit)
+
+
+def validate(df, schema):
+    """Validasi seluruh frame terhadap `schema` dengan operasi per kolom."""
+    n = len(df)
+    columns = list(schema)
+    reasons = np.zeros((n, len(columns)), dtype=np.uint8)
+
+    for j, col in enumerate(columns):
+        lo, hi, allowed, integer = schema[col]
+        if col not in df.columns:
+            reasons[:, j] = REASON_MISSING_COLUMN
+            continue
+
+        values = pd.to_numeric(df[col], errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+        invalid = np.isnan(values)
+        code = np.where(invalid, REASON_INVALID, 0)
+
+        if lo is not None:
+            code |= np.where(~invalid & ((values < lo) | (values > hi)), REASON_OUT_OF_RANGE, 0)
+        if allowed is not None:
+            code |= np.where(~invalid & ~np.isin(values, allowed), REASON_UNKNOWN_CODE, 0)
+        if integer:
+            code |= np.where(~invalid & (values != np.round(values)), REASON_NOT_INTEGER, 0)
+
+        reasons[:, j] = code
+
+    return ValidationResult(columns, reasons.any(axis=1), reasons)
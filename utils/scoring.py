@@ -0,0 +1,140 @@
+"""Scoring bulk per batch untuk kedua model (dipakai file upload, job, evaluasi).
+
+Setiap fungsi menerima satu batch (DataFrame), meng-encode kolom berlabel
+("Typical Angina", "Perempuan", ...) lewat `utils.encoders`, memvalidasinya
+dengan skema di `utils.schema`, lalu hanya baris yang lolos yang diteruskan ke
+model. Baris yang ditolak tetap muncul di output dengan probabilitas kosong dan
+alasan penolakan.
+"""
+
+import numpy as np
+import pandas as pd
+
+from utils.encoders import HEART_ENCODERS, SLEEP_ENCODERS, encode_frame
+from utils.models import HEART_FEATURES, SLEEP_FEATURES
+from utils.postprocess import sleep_postprocess
+from utils.schema import HEART_SCHEMA, SLEEP_BODY_SCHEMA, SLEEP_SCHEMA, describe_reason, validate
+
+
+# =========================
+# UTIL
+# =========================
+def _reason_column(check):
+    """Satu string alasan per baris ("" untuk baris yang lolos)."""
+    out = np.full(len(check.rejected), "", dtype=object)
+    rows = np.flatnonzero(check.rejected)
+    if len(rows):
+        bad = check.reasons[rows]
+        cols = np.asarray(check.columns, dtype=object)
+        out[rows] = [
+            "; ".join(f"{cols[j]}: {describe_reason(r[j])}" for j in np.flatnonzero(r))
+            for r in bad
+        ]
+    return out
+
+
+def _predict_proba(model, frame, features, ok, n_classes):
+    # Model float32 (`utils.precision`) menentukan dtype array probabilitasnya sendiri
+    proba = np.full((len(frame), n_classes), np.nan, dtype=getattr(model, "dtype", np.float64))
+    if ok.any():
+        X = frame[features] if ok.all() else frame.loc[ok, features]
+        proba[ok] = model.predict_proba(X)
+    return proba
+
+
+def _prediction_column(proba, ok):
+    pred = pd.array(np.nan_to_num(proba).argmax(axis=1).astype(np.int8), dtype="Int8")
+    pred[~ok] = pd.NA
+    return pred
+
+
+# =========================
+# HEART
+# =========================
+def score_heart(model, frame, row_offset=0):
+    """Skor satu batch data jantung (kolom `HEART_FEATURES`, berupa kode atau label)."""
+    frame = encode_frame(frame, HEART_ENCODERS, HEART_FEATURES)
+    check = validate(frame, HEART_SCHEMA)
+    ok = ~check.rejected
+    proba = _predict_proba(model, frame, HEART_FEATURES, ok, 2)
+
+    return pd.DataFrame({
+        "baris":                     np.arange(row_offset, row_offset + len(frame)),
+        "prediksi":                  _prediction_column(proba, ok),
+        "prob_tidak_ada_penyakit":   proba[:, 0],
+        "prob_ada_penyakit":         proba[:, 1],
+        "alasan_ditolak":            _reason_column(check),
+    })
+
+
+# =========================
+# SLEEP
+# =========================
+def score_sleep(model, frame, row_offset=0):
+    """Skor satu batch data tidur; BMI ikut dihitung jika ada `Height_cm` & `Weight_kg`."""
+    frame = encode_frame(frame, SLEEP_ENCODERS, SLEEP_FEATURES + list(SLEEP_BODY_SCHEMA))
+    has_body = all(c in frame.columns for c in SLEEP_BODY_SCHEMA)
+    schema = {**SLEEP_SCHEMA, **SLEEP_BODY_SCHEMA} if has_body else SLEEP_SCHEMA
+    check = validate(frame, schema)
+    ok = ~check.rejected
+    proba = _predict_proba(model, frame, SLEEP_FEATURES, ok, 3)
+
+    n = len(frame)
+    confidence = np.full(n, np.nan)
+    severity = np.full(n, "", dtype=object)
+    bmi = np.full(n, np.nan)
+    bmi_category = np.full(n, "", dtype=object)
+    if ok.any():
+        good = frame.loc[ok] if not ok.all() else frame
+        post = sleep_postprocess(
+            good["Height_cm"] if has_body else np.full(len(good), np.nan),
+            good["Weight_kg"] if has_body else np.full(len(good), np.nan),
+            proba[ok],
+            good["Quality_of_Sleep"], good["Stress_Level"], good["Sleep_Duration"],
+        )
+        confidence[ok] = post["confidence"]
+        severity[ok] = post["severity"]
+        if has_body:
+            bmi[ok] = post["bmi"]
+            bmi_category[ok] = post["bmi_category"]
+
+    return pd.DataFrame({
+        "baris":              np.arange(row_offset, row_offset + n),
+        "prediksi":           _prediction_column(proba, ok),
+        "prob_sehat":         proba[:, 0],
+        "prob_insomnia":      proba[:, 1],
+        "prob_sleep_apnea":   proba[:, 2],
+        "kepercayaan":        confidence,
+        "keparahan":          severity,
+        "bmi":                bmi,
+        "kategori_bmi":       bmi_category,
+        "alasan_ditolak":     _reason_column(check),
+    })
+
+
+# Fungsi scoring + kolom yang perlu dibaca dari file untuk masing-masing model
+SCORERS = {
+    "heart": (score_heart, HEART_FEATURES),
+    "sleep": (score_sleep, SLEEP_FEATURES + list(SLEEP_BODY_SCHEMA)),
+}
+
+# Kolom probabilitas di output scorer, urut sesuai `classes_` model
+PROBA_COLUMNS = {
+    "heart": ["prob_tidak_ada_penyakit", "prob_ada_penyakit"],
+    "sleep": ["prob_sehat", "prob_insomnia", "prob_sleep_apnea"],
+}
+
+
+def cohort_summary(result, kind):
+    """Ringkas output scorer (baris yang lolos saja) untuk `CohortStats.add_summary`."""
+    columns = PROBA_COLUMNS[kind]
+    ok = result["prediksi"].notna().to_numpy()
+    proba = result.loc[ok, columns].to_numpy(dtype=float)
+    pred = result.loc[ok, "prediksi"].to_numpy(dtype=np.intp)
+    severity = result.loc[ok, "keparahan"].value_counts() if "keparahan" in result else pd.Series(dtype=int)
+    return {
+        "n":         int(ok.sum()),
+        "classes":   np.bincount(pred, minlength=len(columns)).tolist(),
+        "prob_sum":  proba.sum(axis=0).tolist(),
+        "severity":  {str(k): int(v) for k, v in severity.items()},
+    }
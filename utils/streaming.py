@@ -0,0 +1,330 @@
+"""Scoring streaming model tidur dari feed wearable per pengguna (JSON lines).
+
+Setiap baris adalah satu event JSON dengan `user`, `ts` (detik epoch atau ISO
+8601, opsional) dan satu atau beberapa kolom `SLEEP_FEATURES`:
+
+    {"user": "u-17", "ts": 1760000000, "Heart_Rate": 71}
+    {"user": "u-17", "ts": 1760000060, "Daily_Steps": 120, "Physical_Activity": 2}
+    {"user": "u-17", "Gender": "Perempuan", "Age": 34, "Occupation": 2, "Quality_of_Sleep": 7,
+     "Stress_Level": 5, "Systolic_BP": 120, "Diastolic_BP": 80}
+
+Kolom di `WEARABLE_SIGNALS` adalah bacaan sensor yang diagregasi dalam sliding
+window per pengguna; kolom lain adalah profil (nilai terakhir dipakai). Window
+disimpan sebagai ring buffer bucket waktu berukuran tetap, jadi memori per
+pengguna konstan berapa pun panjang riwayatnya.
+
+Model hanya dipanggil ulang jika fitur window berubah secara material, yaitu
+melewati salah satu threshold split di pohon AdaBoost (`SplitRegions`). Selama
+setiap fitur tetap di region yang sama, semua pohon memilih leaf yang sama dan
+probabilitasnya identik, jadi melewati scoring tidak mengubah hasil. Event
+keluar hanya saat kelas prediksi pengguna berubah.
+"""
+
+import datetime
+import json
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from utils.encoders import CLASS_LABELS, SLEEP_ENCODERS
+from utils.models import SLEEP_FEATURES
+from utils.postprocess import sleep_postprocess
+from utils.schema import SLEEP_SCHEMA, validate
+from utils.scoring import PROBA_COLUMNS
+
+# =========================
+# KONSTANTA
+# =========================
+DAY_SECONDS = 86_400
+WINDOW_SECONDS = DAY_SECONDS   # panjang sliding window
+BUCKET_SECONDS = 3_600         # resolusi window (24 bucket per hari)
+READ_BYTES = 1 << 16           # maks. byte per pembacaan stream (satu micro-batch)
+
+# Setiap entry: fitur model -> (agregasi dalam window, jumlah desimal)
+# "mean" = rata-rata bacaan, "sum" = total bacaan per hari (dinormalisasi ke 24 jam)
+WEARABLE_SIGNALS = {
+    "Heart_Rate":         ("mean",  0),   # bpm per sampel
+    "Daily_Steps":        ("sum",   0),   # langkah sejak bacaan sebelumnya
+    "Physical_Activity":  ("sum",   0),   # menit aktif sejak bacaan sebelumnya
+    "Sleep_Duration":     ("sum",   1),   # jam tidur per sesi
+}
+PROFILE_FEATURES = [f for f in SLEEP_FEATURES if f not in WEARABLE_SIGNALS]
+
+_LEAF = -1   # sklearn menandai leaf dengan children_left == -1
+
+
+def _timestamp(value):
+    if value is None:
+        return time.time()
+    if isinstance(value, str):
+        try:
+            return float(value)
+        except ValueError:
+            return datetime.datetime.fromisoformat(value).timestamp()
+    return float(value)
+
+
+# =========================
+# REGION SPLIT POHON
+# =========================
+class SplitRegions:
+    """Nomor region per fitur terhadap semua threshold split Pipeline scaler + AdaBoost.
+
+    Dua input dengan nomor region yang sama di setiap fitur melewati jalur yang
+    sama di setiap pohon, sehingga `predict_proba`-nya identik.
+    """
+
+    def __init__(self, pipeline):
+        scaler, booster = pipeline[0], pipeline[-1]
+        self.mean = scaler.mean_
+        self.scale = scaler.scale_
+        splits = [[] for _ in range(len(self.mean))]
+        for est in booster.estimators_:
+            tree = est.tree_
+            internal = tree.children_left != _LEAF
+            for f, t in zip(tree.feature[internal], tree.threshold[internal]):
+                splits[f].append(t)
+        self.thresholds = [np.unique(t) for t in splits]
+
+    def signature(self, X):
+        """(n, n_fitur) int16; pohon sklearn membandingkan fitur terskala dalam float32."""
+        Z = ((X - self.mean) / self.scale).astype(np.float32)
+        out = np.empty(X.shape, dtype=np.int16)
+        for f, t in enumerate(self.thresholds):
+            # Jumlah threshold < z = jumlah split yang mengarah ke kanan
+            out[:, f] = np.searchsorted(t, Z[:, f], side="left")
+        return out
+
+
+# =========================
+# STATE PER PENGGUNA (array kolom, tumbuh 2x)
+# =========================
+class StreamScorer:
+    """Sliding window per pengguna + scoring ulang hanya saat region split berubah."""
+
+    def __init__(self, model, window_seconds=WINDOW_SECONDS, bucket_seconds=BUCKET_SECONDS, capacity=1024):
+        if window_seconds % bucket_seconds:
+            raise ValueError("window_seconds harus kelipatan bucket_seconds")
+        self.model = model
+        self.regions = SplitRegions(model)
+        self.window_seconds = window_seconds
+        self.bucket_seconds = bucket_seconds
+        self.n_buckets = window_seconds // bucket_seconds
+
+        self.signals = list(WEARABLE_SIGNALS)
+        self.signal_index = {f: j for j, f in enumerate(self.signals)}
+        self.profile_index = {f: j for j, f in enumerate(PROFILE_FEATURES)}
+        self.columns = [SLEEP_FEATURES.index(f) for f in PROFILE_FEATURES + self.signals]
+        self.is_mean = np.array([WEARABLE_SIGNALS[f][0] == "mean" for f in self.signals])
+        self.decimals = [WEARABLE_SIGNALS[f][1] for f in self.signals]
+        self.bounds = np.array([SLEEP_SCHEMA[f][:2] for f in self.signals], dtype=float)
+
+        self.users = {}          # id pengguna -> baris
+        self.user_ids = []
+        self.touched = set()     # baris yang menerima event sejak flush terakhir
+        self._allocate(capacity)
+
+        self.n_events = 0
+        self.n_invalid = 0       # bukan JSON / tanpa `user` / nilai bukan angka
+        self.n_late = 0          # lebih tua dari window pengguna
+        self.n_scored = 0
+        self.n_skipped = 0       # fitur berubah tapi region split sama
+        self.n_changes = 0
+
+    def _allocate(self, capacity):
+        old = getattr(self, "bucket_ids", None)
+        b, s = self.n_buckets, len(self.signals)
+        arrays = {
+            "bucket_ids":  np.full((capacity, b), -1, dtype=np.int64),
+            "sums":        np.zeros((capacity, b, s)),
+            "counts":      np.zeros((capacity, b, s), dtype=np.int32),
+            "profile":     np.full((capacity, len(PROFILE_FEATURES)), np.nan),
+            "latest":      np.full(capacity, -1, dtype=np.int64),       # bucket terbaru
+            "latest_ts":   np.zeros(capacity),
+            "signature":   np.full((capacity, len(SLEEP_FEATURES)), -1, dtype=np.int16),
+            "label":       np.full(capacity, -1, dtype=np.int8),        # -1 = belum diskor
+        }
+        for name, array in arrays.items():
+            if old is not None:
+                current = getattr(self, name)
+                array[:len(current)] = current
+            setattr(self, name, array)
+
+    @property
+    def nbytes(self):
+        return sum(getattr(self, name).nbytes for name in (
+            "bucket_ids", "sums", "counts", "profile", "latest", "latest_ts", "signature", "label",
+        ))
+
+    def _row(self, user):
+        row = self.users.get(user)
+        if row is None:
+            row = len(self.user_ids)
+            if row == len(self.latest):
+                self._allocate(2 * row)
+            self.users[user] = row
+            self.user_ids.append(user)
+        return row
+
+    # =========================
+    # EVENT
+    # =========================
+    def push(self, event):
+        """Masukkan satu event (dict). Return False jika event dibuang."""
+        self.n_events += 1
+        user = event.get("user") if isinstance(event, dict) else None
+        if user is None:
+            self.n_invalid += 1
+            return False
+        try:
+            ts = _timestamp(event.get("ts"))
+            readings = [(self.signal_index[k], float(v)) for k, v in event.items() if k in self.signal_index]
+            profile = [
+                (self.profile_index[k], SLEEP_ENCODERS[k].transform(np.array([v], dtype=object))[0] if k in SLEEP_ENCODERS else float(v))
+                for k, v in event.items() if k in self.profile_index
+            ]
+        except (TypeError, ValueError):
+            self.n_invalid += 1
+            return False
+
+        row = self._row(str(user))
+        for j, v in profile:
+            self.profile[row, j] = v
+
+        if readings:
+            bucket = int(ts // self.bucket_seconds)
+            slot = bucket % self.n_buckets
+            if bucket <= self.latest[row] - self.n_buckets or self.bucket_ids[row, slot] > bucket:
+                self.n_late += 1
+                return False
+            if self.bucket_ids[row, slot] != bucket:
+                # Slot ring buffer dipakai ulang: buang isi bucket lama di luar window
+                self.bucket_ids[row, slot] = bucket
+                self.sums[row, slot] = 0
+                self.counts[row, slot] = 0
+            for j, v in readings:
+                self.sums[row, slot, j] += v
+                self.counts[row, slot, j] += 1
+            if bucket > self.latest[row]:
+                self.latest[row] = bucket
+            self.latest_ts[row] = max(self.latest_ts[row], ts)
+
+        self.touched.add(row)
+        return True
+
+    def features(self, rows):
+        """Matriks fitur model (n, 11) untuk `rows`; NaN jika window / profil belum lengkap."""
+        in_window = (self.bucket_ids[rows] > (self.latest[rows] - self.n_buckets)[:, None])[:, :, None]
+        sums = (self.sums[rows] * in_window).sum(axis=1)
+        counts = (self.counts[rows] * in_window).sum(axis=1)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            values = np.where(self.is_mean, sums / counts, sums * (DAY_SECONDS / self.window_seconds))
+        values[counts == 0] = np.nan
+        for j, decimals in enumerate(self.decimals):
+            values[:, j] = np.round(values[:, j], decimals)
+        # Bacaan di luar batas skema (mis. > 30.000 langkah) dipotong, bukan ditolak
+        values = np.clip(values, self.bounds[:, 0], self.bounds[:, 1])
+
+        X = np.empty((len(rows), len(SLEEP_FEATURES)))
+        X[:, self.columns] = np.hstack([self.profile[rows], values])
+        return X
+
+    def flush(self):
+        """Skor ulang pengguna yang region split-nya berubah; return event perubahan prediksi."""
+        if not self.touched:
+            return []
+        rows = np.fromiter(self.touched, dtype=np.intp, count=len(self.touched))
+        self.touched.clear()
+
+        X = self.features(rows)
+        frame = pd.DataFrame(X, columns=SLEEP_FEATURES)
+        ok = ~np.isnan(X).any(axis=1) & ~validate(frame, SLEEP_SCHEMA).rejected
+        rows, X, frame = rows[ok], X[ok], frame[ok]
+
+        signature = self.regions.signature(X)
+        dirty = (signature != self.signature[rows]).any(axis=1) | (self.label[rows] < 0)
+        self.n_skipped += int((~dirty).sum())
+        if not dirty.any():
+            return []
+        rows, X, frame, signature = rows[dirty], X[dirty], frame[dirty], signature[dirty]
+
+        proba = self.model.predict_proba(frame)
+        pred = proba.argmax(axis=1).astype(np.int8)
+        previous = self.label[rows].copy()
+        self.signature[rows] = signature
+        self.label[rows] = pred
+        self.n_scored += len(rows)
+
+        changed = np.flatnonzero(pred != previous)
+        self.n_changes += len(changed)
+        if not len(changed):
+            return []
+        post = sleep_postprocess(
+            np.full(len(changed), np.nan), np.full(len(changed), np.nan), proba[changed],
+            frame["Quality_of_Sleep"].to_numpy()[changed],
+            frame["Stress_Level"].to_numpy()[changed],
+            frame["Sleep_Duration"].to_numpy()[changed],
+        )
+        labels = CLASS_LABELS["sleep"]
+        events = []
+        for n, i in enumerate(changed):
+            row = rows[i]
+            events.append({
+                "user":                  self.user_ids[row],
+                "ts":                    float(self.latest_ts[row]),
+                "prediksi_sebelumnya":   labels[previous[i]] if previous[i] >= 0 else None,
+                "prediksi":              labels[pred[i]],
+                **{col: float(p) for col, p in zip(PROBA_COLUMNS["sleep"], proba[i])},
+                "kepercayaan":           float(post["confidence"][n]),
+                "keparahan":             str(post["severity"][n]),
+                "fitur":                 dict(zip(SLEEP_FEATURES, X[i].tolist())),
+            })
+        return events
+
+    def process(self, lines):
+        """Parse satu micro-batch baris JSON, lalu `flush()`."""
+        for line in lines:
+            try:
+                event = json.loads(line)
+            except ValueError:
+                self.n_events += 1
+                self.n_invalid += 1
+                continue
+            self.push(event)
+        return self.flush()
+
+    def stats(self):
+        return {
+            "n_events":    self.n_events,
+            "n_invalid":   self.n_invalid,
+            "n_late":      self.n_late,
+            "n_users":     len(self.user_ids),
+            "n_scored":    self.n_scored,
+            "n_skipped":   self.n_skipped,
+            "n_changes":   self.n_changes,
+            "state_bytes": self.nbytes,
+        }
+
+
+# =========================
+# SUMBER STREAM
+# =========================
+def iter_line_batches(fd, read_bytes=READ_BYTES):
+    """Yield list baris lengkap per `os.read` dari file, pipe, stdin, atau socket.
+
+    `os.read` kembali segera dengan data yang sudah tersedia, jadi feed yang
+    lambat diproses per event dan file besar per blok `read_bytes`.
+    """
+    tail = b""
+    while True:
+        chunk = os.read(fd, read_bytes)
+        if not chunk:
+            break
+        *lines, tail = (tail + chunk).split(b"\n")
+        lines = [line for line in lines if line.strip()]
+        if lines:
+            yield lines
+    if tail.strip():
+        yield [tail]
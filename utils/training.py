@@ -0,0 +1,258 @@
+"""Training ulang model jantung & tidur yang reproducible (dipakai `tools/train.py`).
+
+Dataset berlabel dibaca lewat jalur yang sama dengan evaluasi offline: kolom
+fitur (kode atau label seperti di form) di-encode `utils.encoders`, divalidasi
+`utils.schema`, dan baris yang ditolak skema / labelnya tidak valid dibuang.
+
+Hyperparameter dicari dengan grid search + stratified K-fold di semua core
+(`n_jobs=-1`). Split fold ditentukan sekali dari `seed`, jadi setiap kandidat
+dinilai pada fold yang sama dan run bisa diulang persis. Langkah preprocessing
+Pipeline (StandardScaler model tidur) di-cache per fold dengan `joblib.Memory`,
+sehingga scaler tidak di-fit ulang untuk setiap kombinasi parameter classifier.
+
+Setiap run menghasilkan satu folder versi:
+
+    models/versions/<kind>/<versi>/model.pkl
+    models/versions/<kind>/<versi>/metadata.json   (urutan fitur, versi library,
+                                                   parameter terbaik, skor CV, waktu)
+    models/versions/<kind>/<versi>/reference.json  (rata-rata & std per fitur dari
+                                                   data training)
+
+Model baru baru dipakai aplikasi setelah di-`promote` ke path di `utils.models`.
+Untuk model jantung, `reference.json` ikut dipasang ke `HEART_REFERENCE_PATH`
+karena kontribusi fitur (`utils.explain`) dan jarak pasien serupa dihitung
+relatif terhadap statistik data training model yang sedang dipakai.
+"""
+
+import datetime
+import hashlib
+import json
+import os
+import platform
+import shutil
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+import sklearn
+from sklearn.ensemble import AdaBoostClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.model_selection import GridSearchCV, StratifiedKFold
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+from sklearn.tree import DecisionTreeClassifier
+
+from utils.encoders import (
+    HEART_ENCODERS, SLEEP_ENCODERS, TARGET_COLUMNS, TARGET_ENCODERS, TARGET_LABEL_MAPS, encode_frame,
+)
+from utils.explain import HEART_REFERENCE_PATH
+from utils.ingest import iter_batches
+from utils.models import HEART_FEATURES, HEART_MODEL_PATH, SLEEP_FEATURES, SLEEP_MODEL_PATH
+from utils.schema import HEART_SCHEMA, SLEEP_SCHEMA, validate
+
+# =========================
+# KONSTANTA
+# =========================
+VERSIONS_DIR = "models/versions"
+CACHE_DIR = "data/train_cache"   # cache preprocessing per fold (aman dihapus)
+
+CV_FOLDS = 5
+SEED = 42
+
+# Setiap entry: (fitur, encoder label, skema validasi, path model aplikasi,
+#               path referensi fitur aplikasi atau None)
+TRAINING_DATA = {
+    "heart": (HEART_FEATURES, HEART_ENCODERS, HEART_SCHEMA, HEART_MODEL_PATH, HEART_REFERENCE_PATH),
+    "sleep": (SLEEP_FEATURES, SLEEP_ENCODERS, SLEEP_SCHEMA, SLEEP_MODEL_PATH, None),
+}
+
+# Grid hyperparameter; bentuk estimator sama dengan model yang sekarang dipakai halaman
+SEARCH_SPACES = {
+    "heart": {
+        "C":             np.round(np.logspace(-3, 2, 16), 6).tolist(),
+        "class_weight":  [None, "balanced"],
+    },
+    "sleep": {
+        "classifier__n_estimators":            [25, 50, 100, 200],
+        "classifier__learning_rate":           [0.1, 0.3, 1.0],
+        "classifier__estimator__max_depth":    [1, 2, 3],
+    },
+}
+
+SCORING = {
+    "heart": "roc_auc",
+    "sleep": "f1_macro",   # kelas tidak seimbang (Sehat dominan)
+}
+
+
+def build_estimator(kind, seed=SEED, memory=None):
+    """Estimator dasar sebelum tuning (sama dengan struktur file .pkl di `models/`)."""
+    if kind == "heart":
+        return LogisticRegression(solver="liblinear", random_state=seed)
+    return Pipeline(
+        [
+            ("scaler", StandardScaler()),
+            ("classifier", AdaBoostClassifier(
+                estimator=DecisionTreeClassifier(max_depth=1), random_state=seed,
+            )),
+        ],
+        memory=memory,
+    )
+
+
+# =========================
+# DATASET
+# =========================
+def file_sha256(path, block_bytes=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_bytes), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def load_dataset(kind, source):
+    """Baca file berlabel -> (X, y, jumlah baris dibuang); X berkolom fitur model, float."""
+    features, encoders, schema, _, _ = TRAINING_DATA[kind]
+    target = TARGET_COLUMNS[kind]
+    frame = pd.concat(list(iter_batches(source, features + [target])), ignore_index=True)
+    if target not in frame.columns:
+        raise ValueError(f"Kolom label '{target}' tidak ada di file")
+
+    frame = encode_frame(frame, encoders, features)
+    y = TARGET_ENCODERS[kind].transform(frame[target])
+    classes = sorted(set(TARGET_LABEL_MAPS[kind].values()))
+    keep = ~validate(frame, schema).rejected & np.isin(y, classes)
+    X = frame.loc[keep, features].astype(float).reset_index(drop=True)
+    return X, y[keep].astype(int), int((~keep).sum())
+
+
+# =========================
+# TRAINING
+# =========================
+def _jsonable(value):
+    return value.item() if isinstance(value, np.generic) else value
+
+
+def train(kind, X, y, folds=CV_FOLDS, seed=SEED, n_jobs=-1, cache_dir=CACHE_DIR, verbose=0):
+    """Grid search + CV; kembalikan (model terbaik hasil refit, ringkasan pencarian)."""
+    # Fold tetap untuk semua kandidat -> skor bisa dibandingkan & diulang
+    cv = list(StratifiedKFold(folds, shuffle=True, random_state=seed).split(X, y))
+    memory = joblib.Memory(cache_dir, verbose=0) if kind == "sleep" and cache_dir else None
+
+    search = GridSearchCV(
+        build_estimator(kind, seed, memory),
+        SEARCH_SPACES[kind],
+        scoring=SCORING[kind],
+        cv=cv,
+        n_jobs=n_jobs,
+        refit=True,
+        verbose=verbose,
+    )
+    start = time.perf_counter()
+    search.fit(X, y)
+    elapsed = time.perf_counter() - start
+
+    model = search.best_estimator_
+    if isinstance(model, Pipeline):
+        model.set_params(memory=None)   # artifact tidak bergantung pada folder cache
+
+    results = search.cv_results_
+    candidates = sorted(
+        (
+            {
+                "params":  {k: _jsonable(v) for k, v in params.items()},
+                "mean":    float(mean),
+                "std":     float(std),
+                "rank":    int(rank),
+            }
+            for params, mean, std, rank in zip(
+                results["params"], results["mean_test_score"],
+                results["std_test_score"], results["rank_test_score"],
+            )
+        ),
+        key=lambda c: c["rank"],
+    )
+    summary = {
+        "scoring":           SCORING[kind],
+        "cv_folds":          folds,
+        "seed":              seed,
+        "n_candidates":      len(candidates),
+        "space":             SEARCH_SPACES[kind],
+        "best_params":       {k: _jsonable(v) for k, v in search.best_params_.items()},
+        "best_score":        float(search.best_score_),
+        "search_seconds":    round(elapsed, 3),
+        "candidates":        candidates,
+    }
+    return model, summary
+
+
+# =========================
+# ARTIFACT
+# =========================
+def save_version(kind, model, summary, source, X, y, n_dropped, versions_dir=VERSIONS_DIR):
+    """Tulis `model.pkl` + `metadata.json` ke folder versi baru; kembalikan path folder."""
+    sha = file_sha256(source)
+    now = datetime.datetime.now()
+    version = f"{now:%Y%m%d-%H%M%S}-{sha[:8]}"
+    version_dir = os.path.join(versions_dir, kind, version)
+    os.makedirs(version_dir)
+
+    joblib.dump(model, os.path.join(version_dir, "model.pkl"))
+    classes, counts = np.unique(y, return_counts=True)
+    metadata = {
+        "kind":        kind,
+        "version":     version,
+        "created":     now.isoformat(timespec="seconds"),
+        "features":    list(model.feature_names_in_),
+        "classes":     [int(c) for c in classes],
+        "dataset": {
+            "path":          os.path.abspath(source),
+            "sha256":        sha,
+            "n_rows":        len(X),
+            "n_dropped":     n_dropped,
+            "class_counts":  {int(c): int(n) for c, n in zip(classes, counts)},
+        },
+        "search":      summary,
+        "versions": {
+            "python":   platform.python_version(),
+            "sklearn":  sklearn.__version__,
+            "numpy":    np.__version__,
+            "pandas":   pd.__version__,
+            "joblib":   joblib.__version__,
+        },
+    }
+    with open(os.path.join(version_dir, "metadata.json"), "w", encoding="utf-8") as f:
+        json.dump(metadata, f, indent=2)
+
+    # Format sama dengan models/heart_reference.json (dibaca `load_heart_reference`)
+    reference = {
+        "source": f"{os.path.basename(source)} ({len(X):,} baris, versi {version}) — "
+                  "rata-rata & standar deviasi per kolom data training",
+        "features": {
+            col: {"mean": round(float(X[col].mean()), 6), "std": round(float(X[col].std()), 6)}
+            for col in X.columns
+        },
+    }
+    with open(os.path.join(version_dir, "reference.json"), "w", encoding="utf-8") as f:
+        json.dump(reference, f, indent=2, ensure_ascii=False)
+    return version_dir
+
+
+def _install(src, target):
+    tmp = target + ".tmp"
+    shutil.copyfile(src, tmp)
+    os.replace(tmp, target)
+
+
+def promote(kind, version_dir):
+    """Salin model (dan referensi fitur, jika dipakai aplikasi) versi ini ke path yang
+    dibaca aplikasi (atomic replace); kembalikan daftar path yang diganti."""
+    model_path, reference_path = TRAINING_DATA[kind][3:]
+    installed = []
+    if reference_path is not None:
+        _install(os.path.join(version_dir, "reference.json"), reference_path)
+        installed.append(reference_path)
+    _install(os.path.join(version_dir, "model.pkl"), model_path)
+    return [model_path] + installed